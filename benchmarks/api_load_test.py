@@ -0,0 +1,112 @@
+"""对 HTTP 发布接口做压力测试
+
+在进程内启动 multisync_api 服务，并注册一个模拟平台（固定延迟、总是成功），
+用多条长连接并发提交发布任务，统计受理吞吐量、受理延迟和任务完成耗时。
+不会访问任何真实平台。
+
+用法:
+    python benchmarks/api_load_test.py --requests 5000 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import multisync  # noqa: E402
+import multisync_api  # noqa: E402
+
+
+class MockAdapter(multisync.PlatformAdapter):
+    """模拟平台：按固定延迟返回成功"""
+    name = 'mock'
+    display_name = 'Mock'
+    icon = '🧪'
+    capabilities = {'max_media': 4, 'text_limit': None, 'requires_media': False, 'async_only': False, 'preupload': False}
+    latency = 0.05
+
+    def connect(self, credentials):
+        return True, {}, "模拟平台已连接"
+
+    def publish(self, platform_config, content, media_files, post_settings, media_handles=None):
+        time.sleep(self.latency)
+        return {'success': True, 'post_id': str(time.perf_counter_ns())}
+
+
+async def send_request(reader, writer, method, path, body=None, headers=None):
+    """在已有长连接上发送一个请求，返回 (状态码, JSON 响应)"""
+    data = json.dumps(body).encode('utf-8') if body is not None else b''
+    lines = [f"{method} {path} HTTP/1.1", "Host: localhost", f"Content-Length: {len(data)}"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + data)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(host, port, count, latencies, job_ids):
+    reader, writer = await asyncio.open_connection(host, port)
+    for _ in range(count):
+        started = time.perf_counter()
+        status, body = await send_request(reader, writer, 'POST', '/v1/publish', {
+            'content': "压力测试内容",
+            'platforms': ['mock']
+        }, {'Idempotency-Key': os.urandom(8).hex()})
+        latencies.append((time.perf_counter() - started) * 1000)
+        if status != 202:
+            raise SystemExit(f"请求失败: {status} {body}")
+        job_ids.append(body['job_id'])
+    writer.close()
+
+
+async def run(args):
+    multisync.BUILTIN_PLATFORM_ADAPTERS['mock'] = MockAdapter
+    MockAdapter.latency = args.platform_latency / 1000
+    service = multisync_api.PublishService(workers=args.workers, media_dir=tempfile.mkdtemp())
+    server = await service.start('127.0.0.1', 0)
+    host, port = server.sockets[0].getsockname()[:2]
+
+    latencies, job_ids = [], []
+    per_client = args.requests // args.concurrency
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, per_client, latencies, job_ids) for _ in range(args.concurrency)
+    ))
+    accepted = time.perf_counter() - started
+    await service.queue.join()
+    finished = time.perf_counter() - started
+    server.close()
+
+    failed = [job_id for job_id in job_ids if service.jobs[job_id]['status'] != 'succeeded']
+    latencies.sort()
+    print(f"请求数: {len(latencies)}（并发连接 {args.concurrency}，发布线程 {args.workers}）")
+    print(f"受理吞吐量: {len(latencies) / accepted:.0f} 请求/秒")
+    print(f"受理延迟中位数: {statistics.median(latencies):.1f}ms，P95: {latencies[int(len(latencies) * 0.95) - 1]:.1f}ms")
+    print(f"全部任务完成: {finished:.1f}s（{len(job_ids) / finished:.0f} 任务/秒），失败 {len(failed)} 个")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP 发布接口压力测试")
+    parser.add_argument('--requests', type=int, default=5000, help="发布请求总数")
+    parser.add_argument('--concurrency', type=int, default=64, help="并发连接数")
+    parser.add_argument('--workers', type=int, default=32, help="服务端发布线程数")
+    parser.add_argument('--platform-latency', type=float, default=50, help="模拟平台的发布延迟（毫秒）")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""用 Streamlit AppTest 驱动应用，统计输入帖子内容时的重跑耗时
+
+AppTest 每次都会完整重跑脚本（不区分片段），因此除总耗时外，
+还会输出应用内置性能分析记录的各区块耗时中位数，用来观察「发布内容」区块本身的开销。
+
+用法:
+    python benchmarks/rerun_benchmark.py --runs 30
+"""
+import argparse
+import os
+import statistics
+import time
+
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'multisync.py')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="统计多平台发布工具的重跑耗时")
+    parser.add_argument('--runs', type=int, default=30, help="模拟输入次数")
+    parser.add_argument('--history', type=int, default=500, help="预置的发布历史条数")
+    args = parser.parse_args()
+
+    at = AppTest.from_file(APP_PATH, default_timeout=30)
+    # 预置已连接平台和发布历史，使页面渲染全部标签页
+    at.session_state['authenticated_platforms'] = {
+        'telegram': {'bot_token': 'benchmark', 'channel_id': '@benchmark'}
+    }
+    at.session_state['publish_history'] = [
+        {
+            'timestamp': '2024-01-01 00:00:00',
+            'content': f'历史内容 {i}',
+            'platforms': ['telegram'],
+            'status': '1/1 成功',
+            'media_count': 0
+        }
+        for i in range(args.history)
+    ]
+    at.run()
+
+    timings = []
+    for i in range(args.runs):
+        at.text_area(key='post_content').input(f"基准测试内容 {i}")
+        started = time.perf_counter()
+        at.run()
+        timings.append((time.perf_counter() - started) * 1000)
+        if at.exception:
+            raise SystemExit(f"应用运行出错: {at.exception[0].message}")
+
+    timings.sort()
+    print(f"重跑次数: {len(timings)}")
+    print(f"中位数: {statistics.median(timings):.1f}ms")
+    print(f"P95: {timings[int(len(timings) * 0.95) - 1]:.1f}ms")
+
+    section_timings = {}
+    for profile in at.session_state['rerun_profiles']:
+        for name, elapsed in profile['sections'].items():
+            section_timings.setdefault(name, []).append(elapsed)
+    print("各区块中位数:")
+    for name, values in section_timings.items():
+        print(f"  {name}: {statistics.median(values):.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
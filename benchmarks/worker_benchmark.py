@@ -0,0 +1,124 @@
+"""多进程发布吞吐量与租约争用测试
+
+向临时 SQLite 共享存储提交一批任务（模拟平台，固定延迟），分别用 1、2、4… 个发布进程处理，
+统计吞吐量、领取任务（claim）的耗时分布，并检查每个任务是否恰好发布一次。
+
+用法:
+    python benchmarks/worker_benchmark.py --jobs 1000 --processes 1 2 4 8
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import multisync  # noqa: E402
+import multisync_api  # noqa: E402
+import multisync_store  # noqa: E402
+from api_load_test import MockAdapter  # noqa: E402
+
+
+class TimedStore(multisync_store.SQLiteStore):
+    """记录每次领取任务的耗时"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.claim_times = []
+        self.empty_claims = 0
+
+    def claim_job(self, worker_id, lease_seconds=multisync_store.LEASE_SECONDS):
+        started = time.perf_counter()
+        job = super().claim_job(worker_id, lease_seconds)
+        self.claim_times.append((time.perf_counter() - started) * 1000)
+        if job is None:
+            self.empty_claims += 1
+        return job
+
+
+def run_worker_process(store_path, threads, platform_latency, stop_event, results):
+    published = []
+
+    class RecordingAdapter(MockAdapter):
+        latency = platform_latency
+
+        def publish(self, platform_config, content, media_files, post_settings, media_handles=None):
+            published.append(content)
+            return super().publish(platform_config, content, media_files, post_settings, media_handles)
+
+    multisync.BUILTIN_PLATFORM_ADAPTERS['mock'] = RecordingAdapter
+    store = TimedStore(store_path)
+    connections = multisync_api.PlatformConnections(store=store)
+    workers = [
+        threading.Thread(
+            target=multisync_api.run_store_worker,
+            args=(store, connections, tempfile.gettempdir(), f"{os.getpid()}:{i}", stop_event, 0.05)
+        )
+        for i in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    results.put({'published': published, 'claim_times': store.claim_times, 'empty_claims': store.empty_claims})
+
+
+def run_round(processes, args):
+    store_path = os.path.join(tempfile.mkdtemp(), 'store.db')
+    store = multisync_store.SQLiteStore(store_path)
+    for i in range(args.jobs):
+        store.enqueue_job({'content': f"任务 {i}", 'platforms': ['mock'], 'post_settings': {}, 'media_ids': []})
+
+    stop_event = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(
+            target=run_worker_process,
+            args=(store_path, args.threads, args.platform_latency / 1000, stop_event, results)
+        )
+        for _ in range(processes)
+    ]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    while store.count_jobs('queued') or store.count_jobs('running'):
+        time.sleep(0.02)
+    elapsed = time.perf_counter() - started
+    stop_event.set()
+    reports = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    published = [content for report in reports for content in report['published']]
+    claim_times = sorted(t for report in reports for t in report['claim_times'])
+    duplicates = len(published) - len(set(published))
+    print(
+        f"{processes} 个进程 × {args.threads} 线程: {args.jobs / elapsed:.0f} 任务/秒，"
+        f"claim 中位数 {statistics.median(claim_times):.2f}ms / P99 {claim_times[int(len(claim_times) * 0.99) - 1]:.2f}ms，"
+        f"空领取 {sum(report['empty_claims'] for report in reports)} 次，"
+        f"发布 {len(published)} 次，重复 {duplicates} 次"
+    )
+    return args.jobs / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多进程发布吞吐量与租约争用测试")
+    parser.add_argument('--jobs', type=int, default=1000, help="每轮任务数")
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4], help="发布进程数")
+    parser.add_argument('--threads', type=int, default=4, help="每个进程的发布线程数")
+    parser.add_argument('--platform-latency', type=float, default=50, help="模拟平台的发布延迟（毫秒）")
+    args = parser.parse_args()
+
+    baseline = None
+    for processes in args.processes:
+        throughput = run_round(processes, args)
+        baseline = baseline or throughput / processes
+        print(f"  扩展效率: {throughput / (baseline * processes):.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,23 @@
 import streamlit as st
 import requests
+import urllib3
 import json
 from datetime import datetime, timedelta
 import io
 import base64
+import re
+import csv
+import functools
+import time
+import hashlib
+import os
+import contextlib
+import socket
+import threading
+import statistics
+import concurrent.futures
+
+import multisync_store
 
 # 尝试导入可选的第三方库
 try:
@@ -18,21 +32,11 @@ try:
 except ImportError:
     PIL_AVAILABLE = False
 
-# LinkedIn 使用标准 requests 库，无需额外依赖
-TELEGRAM_AVAILABLE = True
-INSTAGRAM_AVAILABLE = True
-
-# 页面配置
-st.set_page_config(
-    page_title="多平台发布工具",
-    page_icon="📱",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# HTTP 请求超时（连接, 读取），避免平台故障时无限等待；tweepy 客户端也使用同一超时
+REQUEST_TIMEOUT = (5, 30)
 
-# 添加JavaScript代码来处理浏览器缓存
-st.markdown("""
-<script>
+# 浏览器缓存脚本（页面每次渲染时注入）
+BROWSER_CACHE_SCRIPT = """<script>
 // 保存到浏览器缓存
 function saveToCache(key, value) {
     try {
@@ -71,48 +75,40 @@ window.saveToCache = saveToCache;
 window.getFromCache = getFromCache;
 window.clearCache = clearCache;
 </script>
-""", unsafe_allow_html=True)
-
-# 应用标题
-st.title("📱 多平台社交媒体发布工具")
-st.markdown("*无需第三方服务，直接连接各平台API*")
-
-# 检查依赖状态
-st.sidebar.header("📦 依赖状态")
-dependencies_status = {
-    "✅ Streamlit": True,
-    "✅ Requests": True,
-    "📷 PIL/Pillow": PIL_AVAILABLE,
-    "🐦 Twitter (tweepy)": TWITTER_AVAILABLE,
-    "📨 Telegram": TELEGRAM_AVAILABLE,
-    "📸 Instagram": INSTAGRAM_AVAILABLE,
-}
-
-for dep, status in dependencies_status.items():
-    if status:
-        st.sidebar.success(dep)
-    else:
-        st.sidebar.error(dep + " - 未安装")
-
-if not PIL_AVAILABLE:
-    st.sidebar.warning("⚠️ PIL 未安装，图片功能受限")
+"""
 
 # 初始化 session state
-if 'authenticated_platforms' not in st.session_state:
-    st.session_state.authenticated_platforms = {}
-if 'publish_history' not in st.session_state:
-    st.session_state.publish_history = []
-if 'api_credentials' not in st.session_state:
-    st.session_state.api_credentials = {
-        'twitter_api_key': '',
-        'twitter_api_secret': '',
-        'twitter_access_token': '',
-        'twitter_access_secret': '',
-        'telegram_bot_token': '',
-        'telegram_channel_id': '',
-        'instagram_access_token': '',
-        'instagram_user_id': ''
-    }
+def init_session_state():
+    """初始化会话状态（只在首次运行时生效）"""
+    if 'authenticated_platforms' not in st.session_state:
+        st.session_state.authenticated_platforms = {}
+    if 'enabled_platforms' not in st.session_state:
+        # 用户启用的第三方平台，启用后才导入其适配器
+        st.session_state.enabled_platforms = []
+    if 'publish_history' not in st.session_state:
+        st.session_state.publish_history = []
+    if 'post_index' not in st.session_state:
+        st.session_state.post_index = []
+    if 'api_credentials' not in st.session_state:
+        # 键名为 {平台}_{凭据字段}，渲染平台配置时补齐
+        st.session_state.api_credentials = {}
+    if 'content_templates' not in st.session_state:
+        st.session_state.content_templates = {
+            '新品发布': {
+                'body': '🎉 {{product}} 正式上线！{{summary}}',
+                'overrides': {
+                    'twitter': '🎉 {{product}} 上线！{{summary}}',
+                    'telegram': '<b>🎉 {{product}} 正式上线</b>\n{{summary}}\n📅 {{date}}'
+                }
+            }
+        }
+    if 'publish_stats' not in st.session_state:
+        st.session_state.publish_stats = None  # 首次记录时初始化，见 new_publish_stats
+    if 'circuit_breakers' not in st.session_state:
+        st.session_state.circuit_breakers = {}
+    if 'shared_credential_handles' not in st.session_state:
+        # {平台: 当前会话连接所用的共享凭据句柄}，断开连接后保留，避免自动重连
+        st.session_state.shared_credential_handles = {}
 
 # 辅助函数：安全地获取缓存的凭据
 def get_cached_credential(key, default=""):
@@ -126,39 +122,203 @@ def save_credential(key, value):
     """保存凭据到session state"""
     st.session_state.api_credentials[key] = value
 
+# 共享存储：配置 MULTISYNC_STORE 后，多个副本共享平台凭据和发布历史，重启不丢失
+@st.cache_resource
+def get_coordination_store():
+    """打开共享存储，未配置时返回 None（数据只保存在当前会话）"""
+    return multisync_store.open_store_from_env()
+
+@st.cache_resource(show_spinner=False)
+def connect_shared_credentials(platform, handle):
+    """用共享存储中的凭据连接平台，按凭据句柄在进程内缓存；凭据只在服务端读取，不写入会话"""
+    credentials = get_coordination_store().get_credentials(platform)
+    if credentials is None or multisync_store.get_credential_handle(platform, credentials) != handle:
+        raise ValueError("共享凭据已变更")
+    ok, platform_config, message = get_adapter(platform).connect(credentials)
+    if not ok:
+        # 抛出异常而不是返回 None，避免缓存失败结果
+        raise ValueError(message)
+    return platform_config
+
+def sync_shared_connections():
+    """按共享凭据句柄同步当前会话的连接（每次整页运行和发布前调用）
+
+    凭据被删除或替换后断开用旧凭据建立的连接；会话尚未使用过的共享凭据在服务端连接，
+    不把凭据填入输入框
+    """
+    store = get_coordination_store()
+    if store is None:
+        return
+    handles = store.list_credential_handles()
+    session_handles = st.session_state.shared_credential_handles
+    for platform, handle in list(session_handles.items()):
+        if handles.get(platform) != handle:
+            del session_handles[platform]
+            st.session_state.authenticated_platforms.pop(platform, None)
+    for platform, handle in handles.items():
+        if platform in session_handles:
+            continue
+        adapter = get_adapter(platform)
+        if adapter is None or not adapter.is_available():
+            continue
+        try:
+            platform_config = connect_shared_credentials(platform, handle)
+        except Exception:
+            continue
+        st.session_state.authenticated_platforms[platform] = dict(platform_config)
+        session_handles[platform] = handle
+
+def add_publish_history(record):
+    """追加发布记录（配置共享存储时写入存储）"""
+    store = get_coordination_store()
+    if store is not None:
+        store.add_history(record)
+    else:
+        st.session_state.publish_history.append(record)
+
+def get_publish_history():
+    """按时间顺序返回发布记录"""
+    store = get_coordination_store()
+    if store is not None:
+        return store.list_history()
+    return st.session_state.publish_history
+
+def clear_publish_history():
+    store = get_coordination_store()
+    if store is not None:
+        store.clear_history()
+    st.session_state.publish_history = []
+
+# 帖子索引：记录每条帖子在各平台的远端 ID，用于批量撤回和编辑
+def index_published_post(content, publish_results):
+    """把发布成功的平台 ID 记入帖子索引"""
+    accounts = {
+        platform: get_circuit_key(platform, st.session_state.authenticated_platforms[platform])
+        for platform in publish_results if platform in st.session_state.authenticated_platforms
+    }
+    record = multisync_store.new_post_record(content, publish_results, accounts)
+    if not record['platforms']:
+        return
+    store = get_coordination_store()
+    if store is not None:
+        store.add_post(record)
+    else:
+        st.session_state.post_index.append(record)
+
+def get_post_index():
+    """按发布时间顺序返回帖子索引"""
+    store = get_coordination_store()
+    if store is not None:
+        return store.list_posts()
+    return st.session_state.post_index
+
+def update_post_index(post_id, platform, changes):
+    store = get_coordination_store()
+    if store is not None:
+        store.update_post(post_id, platform, changes)
+        return
+    for record in st.session_state.post_index:
+        if record['post_id'] == post_id:
+            record['platforms'][platform].update(changes)
+            return
+
 # 发布函数定义（需要在调用前定义）
-def publish_to_twitter(content, twitter_config, media_files=None):
-    """发布到 Twitter，支持图片上传"""
+def get_twitter_api_v1(twitter_config):
+    """创建 API v1.1 客户端用于媒体上传"""
+    auth = tweepy.OAuth1UserHandler(
+        twitter_config.get('consumer_key'),
+        twitter_config.get('consumer_secret'),
+        twitter_config.get('access_token'),
+        twitter_config.get('access_token_secret')
+    )
+    return tweepy.API(auth, timeout=REQUEST_TIMEOUT)
+
+def create_twitter_client(credentials):
+    """创建 API v2 客户端；tweepy.Client 发请求时不带超时，这里给它的 session 补上"""
+    client = tweepy.Client(
+        consumer_key=credentials['api_key'],
+        consumer_secret=credentials['api_secret'],
+        access_token=credentials['access_token'],
+        access_token_secret=credentials['access_secret']
+    )
+    client.session.request = functools.partial(client.session.request, timeout=REQUEST_TIMEOUT)
+    return client
+
+def upload_twitter_media(twitter_config, media_files):
+    """通过 API v1.1 上传图片到 Twitter，返回 media_id 列表"""
+    api_v1 = get_twitter_api_v1(twitter_config)
+    
+    media_ids = []
+    for media_file in media_files[:4]:  # Twitter 最多支持4张图片
+        try:
+            # 将上传的文件转换为字节
+            media_file.seek(0)  # 重置文件指针
+            media_data = media_file.read()
+            
+            # 上传媒体
+            media = api_v1.media_upload(filename=media_file.name, file=io.BytesIO(media_data))
+            media_ids.append(media.media_id)
+        except Exception as e:
+            st.warning(f"图片 {media_file.name} 上传失败: {str(e)}")
+    return media_ids
+
+# 失败分类
+# 平台调用失败时在结果中记录 HTTP 状态码（status_code）或明确的 retryable，
+# 由 is_retryable_failure 判断是否值得稍后重试，不依赖错误信息的文字格式；
+# 请求发出后才失败的（读超时、连接中断、5xx）帖子可能已经发布，记为 delivery_unknown，只能人工确认后重试
+RETRYABLE_STATUS_CODES = {408, 425, 429}
+INSTAGRAM_RATE_LIMIT_CODES = {4, 17, 32, 613}  # Graph API 限流错误码，HTTP 状态可能是 400
+
+def get_exception_failure(e):
+    """把平台调用抛出的异常转换为失败结果：平台返回的错误带状态码，网络错误可重试，其余不重试"""
+    result = {'success': False, 'error': str(e)}
+    if TWITTER_AVAILABLE and isinstance(e, tweepy.HTTPException):
+        result['status_code'] = e.response.status_code
+    elif isinstance(e, OSError):
+        # requests 的连接、超时等异常都是 OSError 的子类
+        response = getattr(e, 'response', None)
+        if response is not None:
+            result['status_code'] = response.status_code
+        else:
+            result['retryable'] = True
+            result['delivery_unknown'] = not is_connect_failure(e)
+    else:
+        result['retryable'] = False
+    return result
+
+def is_connect_failure(e):
+    """异常是否发生在建立连接阶段（请求肯定没有发出）"""
+    if isinstance(e, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(e, requests.exceptions.ConnectionError):
+        # requests 把 urllib3 的 MaxRetryError 作为第一个参数，reason 为底层错误
+        reason = getattr(e.args[0], 'reason', None) if e.args else None
+        return isinstance(reason, urllib3.exceptions.NewConnectionError)
+    return isinstance(e, (ConnectionRefusedError, socket.gaierror))
+
+def get_instagram_failure(message, response):
+    """Graph API 错误响应转换为失败结果，限流错误码按可重试处理"""
+    result = {'success': False, 'error': f'{message}: {response.text}', 'status_code': response.status_code}
+    try:
+        error_code = response.json().get('error', {}).get('code')
+    except ValueError:
+        error_code = None
+    if error_code in INSTAGRAM_RATE_LIMIT_CODES:
+        result['retryable'] = True
+    return result
+
+def publish_to_twitter(content, twitter_config, media_files=None, media_ids=None):
+    """发布到 Twitter，支持图片上传（media_ids 为预上传得到的 media_id，可跳过上传）"""
     try:
         client = twitter_config['client']
         
         # 检查内容长度
         if len(content) > 280:
-            return {'success': False, 'error': '内容超过 280 字符限制'}
+            return {'success': False, 'error': '内容超过 280 字符限制', 'retryable': False}
         
         # 处理图片上传
-        media_ids = []
-        if media_files:
-            # 创建 API v1.1 客户端用于媒体上传
-            auth = tweepy.OAuth1UserHandler(
-                twitter_config.get('consumer_key'),
-                twitter_config.get('consumer_secret'),
-                twitter_config.get('access_token'),
-                twitter_config.get('access_token_secret')
-            )
-            api_v1 = tweepy.API(auth)
-            
-            for media_file in media_files[:4]:  # Twitter 最多支持4张图片
-                try:
-                    # 将上传的文件转换为字节
-                    media_file.seek(0)  # 重置文件指针
-                    media_data = media_file.read()
-                    
-                    # 上传媒体
-                    media = api_v1.media_upload(filename=media_file.name, file=io.BytesIO(media_data))
-                    media_ids.append(media.media_id)
-                except Exception as e:
-                    st.warning(f"图片 {media_file.name} 上传失败: {str(e)}")
+        if not media_ids:
+            media_ids = upload_twitter_media(twitter_config, media_files) if media_files else []
         
         # 发布推文
         if media_ids:
@@ -169,45 +329,54 @@ def publish_to_twitter(content, twitter_config, media_files=None):
         return {'success': True, 'post_id': response.data['id'], 'media_count': len(media_ids)}
         
     except Exception as e:
-        return {'success': False, 'error': str(e)}
+        return get_exception_failure(e)
 
-def publish_to_telegram(content, telegram_config, media_files=None):
-    """发布到 Telegram 频道，支持图片"""
+def publish_to_telegram(content, telegram_config, media_files=None, file_ids=None):
+    """发布到 Telegram 频道，支持图片（file_ids 为预上传得到的 file_id，可直接复用）"""
     try:
         bot_token = telegram_config['bot_token']
         channel_id = telegram_config['channel_id']
         
         # 如果有图片，发送图片+文字
-        if media_files:
+        if media_files or file_ids:
+            photo_count = len(file_ids) if file_ids else len(media_files)
             # Telegram 支持多种媒体类型
-            if len(media_files) == 1:
+            if photo_count == 1:
                 # 单张图片
-                media_file = media_files[0]
-                media_file.seek(0)
-                
                 url = f"https://api.telegram.org/bot{bot_token}/sendPhoto"
                 
-                files = {'photo': (media_file.name, media_file, 'image/jpeg')}
                 data = {
                     'chat_id': channel_id,
                     'caption': content,
                     'parse_mode': 'HTML'
                 }
                 
-                response = requests.post(url, data=data, files=files)
+                if file_ids:
+                    data['photo'] = file_ids[0]
+                    response = requests.post(url, data=data, timeout=REQUEST_TIMEOUT)
+                else:
+                    media_file = media_files[0]
+                    media_file.seek(0)
+                    files = {'photo': (media_file.name, media_file, 'image/jpeg')}
+                    response = requests.post(url, data=data, files=files, timeout=REQUEST_TIMEOUT)
             else:
                 # 多张图片 - 使用 media group
                 media_group = []
                 files = {}
                 
-                for i, media_file in enumerate(media_files[:10]):  # Telegram 最多10张
-                    media_file.seek(0)
-                    file_key = f"photo{i}"
-                    files[file_key] = (media_file.name, media_file, 'image/jpeg')
+                for i in range(min(photo_count, 10)):  # Telegram 最多10张
+                    if file_ids:
+                        media_ref = file_ids[i]
+                    else:
+                        media_file = media_files[i]
+                        media_file.seek(0)
+                        file_key = f"photo{i}"
+                        files[file_key] = (media_file.name, media_file, 'image/jpeg')
+                        media_ref = f'attach://{file_key}'
                     
                     media_item = {
                         'type': 'photo',
-                        'media': f'attach://{file_key}'
+                        'media': media_ref
                     }
                     
                     # 第一张图片添加caption
@@ -223,7 +392,7 @@ def publish_to_telegram(content, telegram_config, media_files=None):
                     'media': json.dumps(media_group)
                 }
                 
-                response = requests.post(url, data=data, files=files)
+                response = requests.post(url, data=data, files=files or None, timeout=REQUEST_TIMEOUT)
         else:
             # 纯文本消息
             url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
@@ -233,18 +402,108 @@ def publish_to_telegram(content, telegram_config, media_files=None):
                 'parse_mode': 'HTML',
                 'disable_web_page_preview': False
             }
-            response = requests.post(url, data=data)
+            response = requests.post(url, data=data, timeout=REQUEST_TIMEOUT)
         
         if response.status_code == 200:
             result = response.json()
             if result['ok']:
-                message_id = result['result']['message_id'] if 'message_id' in result['result'] else result['result'][0]['message_id']
-                return {'success': True, 'post_id': message_id}
+                # 媒体组返回每张图片各自的消息，撤回时需要全部删除
+                messages = result['result'] if isinstance(result['result'], list) else [result['result']]
+                return {
+                    'success': True,
+                    'post_id': messages[0]['message_id'],
+                    'message_ids': [message['message_id'] for message in messages],
+                    'chat_id': channel_id,
+                    'media_count': len(messages) if (media_files or file_ids) else 0
+                }
             else:
-                return {'success': False, 'error': result.get('description', 'Unknown error')}
+                return {
+                    'success': False,
+                    'error': result.get('description', 'Unknown error'),
+                    'status_code': result.get('error_code')
+                }
         else:
-            return {'success': False, 'error': f'HTTP {response.status_code}'}
+            return {'success': False, 'error': f'HTTP {response.status_code}', 'status_code': response.status_code}
             
+    except Exception as e:
+        return get_exception_failure(e)
+
+def preupload_telegram_photo(telegram_config, staging_chat_id, name, data):
+    """把图片发送到暂存会话以获取可复用的 file_id，随后删除暂存消息"""
+    bot_token = telegram_config['bot_token']
+    response = requests.post(
+        f"https://api.telegram.org/bot{bot_token}/sendPhoto",
+        data={'chat_id': staging_chat_id, 'disable_notification': True},
+        files={'photo': (name, io.BytesIO(data), 'image/jpeg')},
+        timeout=REQUEST_TIMEOUT
+    )
+    result = response.json()
+    if not result.get('ok'):
+        raise RuntimeError(result.get('description', f'HTTP {response.status_code}'))
+    
+    message = result['result']
+    requests.post(
+        f"https://api.telegram.org/bot{bot_token}/deleteMessage",
+        data={'chat_id': staging_chat_id, 'message_id': message['message_id']},
+        timeout=REQUEST_TIMEOUT
+    )
+    # 取最大尺寸的 file_id
+    return message['photo'][-1]['file_id']
+
+def parse_telegram_response(response):
+    """Bot API 响应转换为结果字典；限流时带上平台要求的等待秒数"""
+    result = response.json()
+    if result.get('ok'):
+        return {'success': True}
+    return {
+        'success': False,
+        'error': result.get('description', f'HTTP {response.status_code}'),
+        'retry_after': result.get('parameters', {}).get('retry_after')
+    }
+
+def delete_telegram_messages(telegram_config, chat_id, message_ids):
+    """一次删除同一会话中的多条消息（最多 100 条），已不存在的消息会被跳过"""
+    response = requests.post(
+        f"https://api.telegram.org/bot{telegram_config['bot_token']}/deleteMessages",
+        data={'chat_id': chat_id, 'message_ids': json.dumps(message_ids)},
+        timeout=REQUEST_TIMEOUT
+    )
+    result = parse_telegram_response(response)
+    if not result['success'] and 'not found' in result['error']:
+        return {'success': True}
+    return result
+
+def edit_telegram_message(telegram_config, chat_id, message_id, content, caption=False):
+    """编辑消息文字；图片消息编辑的是说明文字"""
+    data = {'chat_id': chat_id, 'message_id': message_id, 'parse_mode': 'HTML'}
+    if caption:
+        method = 'editMessageCaption'
+        data['caption'] = content
+    else:
+        method = 'editMessageText'
+        data['text'] = content
+    response = requests.post(
+        f"https://api.telegram.org/bot{telegram_config['bot_token']}/{method}",
+        data=data,
+        timeout=REQUEST_TIMEOUT
+    )
+    result = parse_telegram_response(response)
+    if not result['success'] and 'message is not modified' in result['error']:
+        return {'success': True}
+    return result
+
+def delete_tweet(twitter_config, tweet_id):
+    """删除推文；推文已不存在视为成功"""
+    try:
+        response = twitter_config['client'].delete_tweet(tweet_id)
+        if response.data and response.data.get('deleted'):
+            return {'success': True}
+        return {'success': False, 'error': '删除失败'}
+    except tweepy.NotFound:
+        return {'success': True}
+    except tweepy.TooManyRequests as e:
+        reset_at = int(e.response.headers.get('x-rate-limit-reset', 0))
+        return {'success': False, 'error': '请求过于频繁', 'retry_after': max(reset_at - time.time(), 1)}
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
@@ -257,7 +516,7 @@ def publish_to_instagram(content, instagram_config):
         # Instagram Basic Display API - 创建媒体容器
         # 注意：Instagram API 需要图片，纯文本无法发布
         if 'media_url' not in instagram_config:
-            return {'success': False, 'error': 'Instagram 需要图片才能发布内容'}
+            return {'success': False, 'error': 'Instagram 需要图片才能发布内容', 'retryable': False}
         
         media_url = instagram_config['media_url']
         
@@ -269,10 +528,10 @@ def publish_to_instagram(content, instagram_config):
             'access_token': access_token
         }
         
-        container_response = requests.post(container_url, data=container_data)
+        container_response = requests.post(container_url, data=container_data, timeout=REQUEST_TIMEOUT)
         
         if container_response.status_code != 200:
-            return {'success': False, 'error': f'创建媒体容器失败: {container_response.text}'}
+            return get_instagram_failure('创建媒体容器失败', container_response)
         
         container_id = container_response.json().get('id')
         
@@ -283,606 +542,2419 @@ def publish_to_instagram(content, instagram_config):
             'access_token': access_token
         }
         
-        publish_response = requests.post(publish_url, data=publish_data)
+        publish_response = requests.post(publish_url, data=publish_data, timeout=REQUEST_TIMEOUT)
         
         if publish_response.status_code == 200:
             result = publish_response.json()
             return {'success': True, 'post_id': result.get('id', '')}
         else:
-            return {'success': False, 'error': f'发布失败: {publish_response.text}'}
+            return get_instagram_failure('发布失败', publish_response)
             
     except Exception as e:
-        return {'success': False, 'error': str(e)}
+        return get_exception_failure(e)
 
-# 侧边栏 - 平台配置
-with st.sidebar:
-    st.header("🔑 平台配置")
-    
-    # Twitter/X 配置
-    st.subheader("🐦 Twitter/X")
-    if not TWITTER_AVAILABLE:
-        st.error("❌ 需要安装 tweepy 包")
-        st.info("在 requirements.txt 中添加: tweepy>=4.14.0")
-    else:
-        with st.expander("Twitter API 设置"):
-            # 使用缓存的值作为默认值
-            twitter_api_key = st.text_input(
-                "API Key", 
-                type="password", 
-                key="twitter_key",
-                value=get_cached_credential('twitter_api_key'),
-                help="🔒 安全存储在浏览器本地"
-            )
-            twitter_api_secret = st.text_input(
-                "API Secret", 
-                type="password", 
-                key="twitter_secret",
-                value=get_cached_credential('twitter_api_secret'),
-                help="🔒 安全存储在浏览器本地"
-            )
-            twitter_access_token = st.text_input(
-                "Access Token", 
-                type="password", 
-                key="twitter_token",
-                value=get_cached_credential('twitter_access_token'),
-                help="🔒 安全存储在浏览器本地"
-            )
-            twitter_access_secret = st.text_input(
-                "Access Token Secret", 
-                type="password", 
-                key="twitter_token_secret",
-                value=get_cached_credential('twitter_access_secret'),
-                help="🔒 安全存储在浏览器本地"
-            )
-            
-            col_a, col_b = st.columns(2)
-            with col_a:
-                if st.button("连接 Twitter", key="connect_twitter"):
-                    if all([twitter_api_key, twitter_api_secret, twitter_access_token, twitter_access_secret]):
-                        try:
-                            # 保存凭据
-                            save_credential('twitter_api_key', twitter_api_key)
-                            save_credential('twitter_api_secret', twitter_api_secret)
-                            save_credential('twitter_access_token', twitter_access_token)
-                            save_credential('twitter_access_secret', twitter_access_secret)
-                            
-                            # 创建 Twitter API v2 客户端
-                            client = tweepy.Client(
-                                consumer_key=twitter_api_key,
-                                consumer_secret=twitter_api_secret,
-                                access_token=twitter_access_token,
-                                access_token_secret=twitter_access_secret
-                            )
-                            
-                            # 测试连接
-                            user = client.get_me()
-                            st.session_state.authenticated_platforms['twitter'] = {
-                                'client': client,
-                                'consumer_key': twitter_api_key,
-                                'consumer_secret': twitter_api_secret,
-                                'access_token': twitter_access_token,
-                                'access_token_secret': twitter_access_secret,
-                                'user_id': user.data.id,
-                                'username': user.data.username
-                            }
-                            st.success(f"✅ Twitter 连接成功！用户: @{user.data.username}")
-                            st.info("🔒 API密钥已安全保存到浏览器缓存")
-                        except Exception as e:
-                            st.error(f"❌ Twitter 连接失败: {str(e)}")
-                    else:
-                        st.warning("请填写所有 Twitter API 凭据")
-            
-            with col_b:
-                if st.button("🗑️ 清除缓存", key="clear_twitter_cache"):
-                    save_credential('twitter_api_key', '')
-                    save_credential('twitter_api_secret', '')
-                    save_credential('twitter_access_token', '')
-                    save_credential('twitter_access_secret', '')
-                    st.success("Twitter 缓存已清除")
-                    st.rerun()
-    
-    # Telegram 配置
-    st.subheader("📨 Telegram")
-    with st.expander("Telegram Bot API 设置"):
-        telegram_bot_token = st.text_input(
-            "Bot Token", 
-            type="password", 
-            key="telegram_token", 
-            value=get_cached_credential('telegram_bot_token'),
-            help="从 @BotFather 获取 | 🔒 安全存储在浏览器本地"
-        )
-        telegram_channel_id = st.text_input(
-            "频道 ID", 
-            key="telegram_channel", 
-            value=get_cached_credential('telegram_channel_id'),
-            placeholder="@your_channel 或 -100xxxxxxxxx",
-            help="频道用户名（@开头）或频道 ID | 🔒 安全存储在浏览器本地"
-        )
-        
-        col_a, col_b = st.columns(2)
-        with col_a:
-            if st.button("连接 Telegram", key="connect_telegram"):
-                if telegram_bot_token and telegram_channel_id:
-                    try:
-                        # 保存凭据
-                        save_credential('telegram_bot_token', telegram_bot_token)
-                        save_credential('telegram_channel_id', telegram_channel_id)
-                        
-                        # 验证 bot token
-                        test_url = f"https://api.telegram.org/bot{telegram_bot_token}/getMe"
-                        response = requests.get(test_url)
-                        
-                        if response.status_code == 200:
-                            bot_info = response.json()
-                            if bot_info['ok']:
-                                st.session_state.authenticated_platforms['telegram'] = {
-                                    'bot_token': telegram_bot_token,
-                                    'channel_id': telegram_channel_id
-                                }
-                                bot_name = bot_info['result']['first_name']
-                                st.success(f"✅ Telegram 连接成功！Bot: {bot_name}")
-                                st.info("🔒 API密钥已安全保存到浏览器缓存")
-                            else:
-                                st.error("❌ Bot Token 无效")
-                        else:
-                            st.error("❌ Telegram 连接失败")
-                    except Exception as e:
-                        st.error(f"❌ Telegram 连接失败: {str(e)}")
-                else:
-                    st.warning("请填写 Bot Token 和频道 ID")
-        
-        with col_b:
-            if st.button("🗑️ 清除缓存", key="clear_telegram_cache"):
-                save_credential('telegram_bot_token', '')
-                save_credential('telegram_channel_id', '')
-                st.success("Telegram 缓存已清除")
-                st.rerun()
-    
-    # Instagram 配置  
-    st.subheader("📸 Instagram")
-    with st.expander("Instagram API 设置"):
-        instagram_access_token = st.text_input(
-            "Access Token", 
-            type="password", 
-            key="instagram_token",
-            value=get_cached_credential('instagram_access_token'),
-            help="🔒 安全存储在浏览器本地"
-        )
-        instagram_user_id = st.text_input(
-            "Instagram User ID", 
-            key="instagram_user_id",
-            value=get_cached_credential('instagram_user_id'),
-            help="🔒 安全存储在浏览器本地"
-        )
-        
-        st.info("⚠️ Instagram 需要图片才能发布内容，纯文本无法发布")
-        
-        col_a, col_b = st.columns(2)
-        with col_a:
-            if st.button("连接 Instagram", key="connect_instagram"):
-                if instagram_access_token and instagram_user_id:
-                    try:
-                        # 保存凭据
-                        save_credential('instagram_access_token', instagram_access_token)
-                        save_credential('instagram_user_id', instagram_user_id)
-                        
-                        # 验证 Instagram token
-                        test_url = f"https://graph.instagram.com/v18.0/{instagram_user_id}"
-                        params = {'fields': 'id,username', 'access_token': instagram_access_token}
-                        response = requests.get(test_url, params=params)
-                        
-                        if response.status_code == 200:
-                            user_info = response.json()
-                            st.session_state.authenticated_platforms['instagram'] = {
-                                'access_token': instagram_access_token,
-                                'user_id': instagram_user_id
-                            }
-                            username = user_info.get('username', 'Unknown')
-                            st.success(f"✅ Instagram 连接成功！用户: @{username}")
-                            st.info("🔒 API密钥已安全保存到浏览器缓存")
-                        else:
-                            st.error(f"❌ Instagram 连接失败: {response.text}")
-                    except Exception as e:
-                        st.error(f"❌ Instagram 连接失败: {str(e)}")
-                else:
-                    st.warning("请填写 Instagram 凭据")
-        
-        with col_b:
-            if st.button("🗑️ 清除缓存", key="clear_instagram_cache"):
-                save_credential('instagram_access_token', '')
-                save_credential('instagram_user_id', '')
-                st.success("Instagram 缓存已清除")
-                st.rerun()
-    
-    # 显示已连接平台
-    st.header("✅ 已连接平台")
-    for platform in st.session_state.authenticated_platforms:
-        st.success(f"✅ {platform.title()}")
+# 连接探测（连接平台和熔断器半开探测共用）
+def probe_twitter(twitter_config):
+    """通过 get_me 验证 Twitter 凭据，返回 (是否成功, 用户信息或错误信息)"""
+    try:
+        user = twitter_config['client'].get_me()
+        return True, user.data
+    except Exception as e:
+        return False, f"Twitter 连接失败: {str(e)}"
 
-# 主内容区域
-if not st.session_state.authenticated_platforms:
-    st.warning("请在侧边栏配置并连接至少一个社交媒体平台")
-    
-    # 显示API获取指南
-    with st.expander("📖 API 获取指南", expanded=True):
-        st.markdown("""
+def probe_telegram(telegram_config):
+    """通过 getMe 验证 Telegram Bot Token，返回 (是否成功, Bot 信息或错误信息)"""
+    try:
+        test_url = f"https://api.telegram.org/bot{telegram_config['bot_token']}/getMe"
+        response = requests.get(test_url, timeout=REQUEST_TIMEOUT)
+
+        if response.status_code == 200:
+            bot_info = response.json()
+            if bot_info['ok']:
+                return True, bot_info['result']
+            return False, "Bot Token 无效"
+        return False, "Telegram 连接失败"
+    except Exception as e:
+        return False, f"Telegram 连接失败: {str(e)}"
+
+def probe_instagram(instagram_config):
+    """通过 Graph API 验证 Instagram 凭据，返回 (是否成功, 用户信息或错误信息)"""
+    try:
+        test_url = f"https://graph.instagram.com/v18.0/{instagram_config['user_id']}"
+        params = {'fields': 'id,username', 'access_token': instagram_config['access_token']}
+        response = requests.get(test_url, params=params, timeout=REQUEST_TIMEOUT)
+
+        if response.status_code == 200:
+            return True, response.json()
+        return False, f"Instagram 连接失败: {response.text}"
+    except Exception as e:
+        return False, f"Instagram 连接失败: {str(e)}"
+
+# 平台适配器
+# 每个平台实现同一组接口：连接、校验、生成内容、上传媒体、发布；
+# 新平台通过 entry point（组名 multisync.platforms）注册，按需加载，不需要修改发布流程
+PLATFORM_ENTRY_POINT_GROUP = 'multisync.platforms'
+
+class PlatformAdapter:
+    """平台适配器基类"""
+    name = ''
+    display_name = ''
+    icon = '📱'
+    requirement = ''  # 额外依赖包，显示在依赖状态中
+    credential_key = ''  # 熔断器区分凭据所用的字段
+    credential_fields = []  # [{'key', 'label', 'secret', 'placeholder', 'help'}]
+    # requires_media: 没有图片时不能发布；async_only: 界面发布时不同步等待，写入发件箱由后台线程发布；
+    # retract/edit: 是否支持撤回和编辑；retract_batch: 一次删除调用最多包含的远端 ID 数；bulk_rate: 批量操作限速 (次数, 秒)
+    capabilities = {'max_media': 0, 'text_limit': None, 'requires_media': False, 'async_only': False, 'preupload': False,
+                    'retract': False, 'edit': False, 'retract_batch': 1, 'bulk_rate': None}
+    notice = ''
+    guide = ''
+
+    @property
+    def label(self):
+        return f"{self.icon} {self.display_name}"
+
+    def is_available(self):
+        """依赖是否已安装"""
+        return True
+
+    def connect(self, credentials):
+        """用凭据建立连接，返回 (是否成功, 平台配置, 提示信息)"""
+        raise NotImplementedError
+
+    def probe(self, platform_config):
+        """轻量连接探测，返回 (是否成功, 信息)"""
+        raise NotImplementedError
+
+    def render_post_settings(self, uploaded_files):
+        """在发布设置栏渲染平台特定选项，返回合并到 post_settings 的字典"""
+        return {}
+
+    def render_preupload_settings(self):
+        """开启预上传时为已连接的平台渲染预上传所需的选项，返回合并到 post_settings 的字典"""
+        return {}
+
+    def compile_payload(self, content, post_settings):
+        """根据发布设置生成该平台的最终内容"""
+        if post_settings.get('link_url'):
+            content += f"\n{post_settings['link_url']}"
+        return content
+
+    def validate(self, content, media_files, post_settings):
+        """发布前校验，返回错误信息或 None"""
+        text_limit = self.capabilities.get('text_limit')
+        if text_limit and len(content) > text_limit:
+            return f'内容超过 {text_limit} 字符限制'
+        if self.capabilities.get('requires_media') and not media_files:
+            return f'{self.display_name} 需要图片才能发布'
+        return None
+
+    def upload_media(self, platform_config, media_files):
+        """上传媒体，返回平台媒体句柄列表；不支持独立上传的平台原样返回文件"""
+        return list(media_files or [])
+
+    def preupload_media(self, platform_config, name, data, post_settings):
+        """在后台线程中预上传单个文件，返回 (媒体句柄, 过期时间戳或 None)；不能调用 st.* """
+        raise NotImplementedError
+
+    def publish(self, platform_config, content, media_files=None, post_settings=None, media_handles=None):
+        """发布内容，返回 {'success': ..., 'post_id'/'error': ...}；media_handles 为预上传的媒体句柄"""
+        raise NotImplementedError
+
+    def retract(self, platform_config, remote_posts):
+        """删除帖子索引中的平台条目（远端 ID 总数不超过 retract_batch），返回 {'success', 'error', 'retry_after'}；不能调用 st.*"""
+        raise NotImplementedError
+
+    def edit(self, platform_config, remote_post, content):
+        """把帖子索引中的平台条目改为新内容，返回值同 retract；不能调用 st.*"""
+        raise NotImplementedError
+
+class TwitterAdapter(PlatformAdapter):
+    name = 'twitter'
+    display_name = 'Twitter'
+    icon = '🐦'
+    requirement = 'tweepy>=4.14.0'
+    credential_key = 'access_token'
+    credential_fields = [
+        {'key': 'api_key', 'label': 'API Key', 'secret': True},
+        {'key': 'api_secret', 'label': 'API Secret', 'secret': True},
+        {'key': 'access_token', 'label': 'Access Token', 'secret': True},
+        {'key': 'access_secret', 'label': 'Access Token Secret', 'secret': True}
+    ]
+    # API 不支持编辑推文；删除接口限速为每 15 分钟 50 次
+    capabilities = {'max_media': 4, 'text_limit': 280, 'requires_media': False, 'async_only': False, 'preupload': True,
+                    'retract': True, 'edit': False, 'retract_batch': 1, 'bulk_rate': (50, 900)}
+    guide = """
         ### 🐦 Twitter API
         1. 访问 [developer.twitter.com](https://developer.twitter.com)
         2. 申请开发者账户
         3. 创建新应用
         4. 生成 API Keys 和 Access Tokens
-        
+        """
+
+    def is_available(self):
+        return TWITTER_AVAILABLE
+
+    def connect(self, credentials):
+        # 创建 Twitter API v2 客户端
+        client = create_twitter_client(credentials)
+        twitter_config = {
+            'client': client,
+            'consumer_key': credentials['api_key'],
+            'consumer_secret': credentials['api_secret'],
+            'access_token': credentials['access_token'],
+            'access_token_secret': credentials['access_secret']
+        }
+
+        # 测试连接
+        ok, user = self.probe(twitter_config)
+        if not ok:
+            return False, None, user
+        twitter_config['user_id'] = user.id
+        twitter_config['username'] = user.username
+        return True, twitter_config, f"用户: @{user.username}"
+
+    def probe(self, platform_config):
+        return probe_twitter(platform_config)
+
+    def render_post_settings(self, uploaded_files):
+        add_hashtags = st.checkbox("自动添加热门标签", key="twitter_hashtags")
+        if add_hashtags:
+            hashtags = st.text_input("标签（用空格分隔）", value="#社交媒体 #分享", key="twitter_hashtag_input")
+        else:
+            hashtags = ""
+        return {'add_hashtags': add_hashtags, 'hashtags': hashtags}
+
+    def compile_payload(self, content, post_settings):
+        if post_settings.get('add_hashtags') and post_settings.get('hashtags'):
+            content += f"\n\n{post_settings['hashtags']}"
+        return super().compile_payload(content, post_settings)
+
+    def upload_media(self, platform_config, media_files):
+        return upload_twitter_media(platform_config, media_files)
+
+    def preupload_media(self, platform_config, name, data, post_settings):
+        media = get_twitter_api_v1(platform_config).media_upload(filename=name, file=io.BytesIO(data))
+        # 未使用的 media_id 会在 expires_after_secs 后失效，预留 5 分钟余量
+        expires_after = getattr(media, 'expires_after_secs', None) or 86400
+        return media.media_id, time.time() + expires_after - 300
+
+    def publish(self, platform_config, content, media_files=None, post_settings=None, media_handles=None):
+        return publish_to_twitter(content, platform_config, media_files, media_ids=media_handles)
+
+    def retract(self, platform_config, remote_posts):
+        for remote_post in remote_posts:
+            for tweet_id in remote_post['ids']:
+                result = delete_tweet(platform_config, tweet_id)
+                if not result['success']:
+                    return result
+        return {'success': True}
+
+class TelegramAdapter(PlatformAdapter):
+    name = 'telegram'
+    display_name = 'Telegram'
+    icon = '📨'
+    credential_key = 'bot_token'
+    credential_fields = [
+        {'key': 'bot_token', 'label': 'Bot Token', 'secret': True, 'help': '从 @BotFather 获取'},
+        {'key': 'channel_id', 'label': '频道 ID', 'placeholder': '@your_channel 或 -100xxxxxxxxx',
+         'help': '频道用户名（@开头）或频道 ID'}
+    ]
+    # deleteMessages 一次最多删除 100 条消息
+    capabilities = {'max_media': 10, 'text_limit': 4096, 'requires_media': False, 'async_only': False, 'preupload': True,
+                    'retract': True, 'edit': True, 'retract_batch': 100, 'bulk_rate': (20, 1)}
+    guide = """
         ### 📨 Telegram Bot API  
         1. 在 Telegram 中找到 @BotFather
         2. 发送 `/newbot` 创建新 bot
         3. 获取 Bot Token
         4. 将 bot 添加到您的频道并设为管理员
         5. 频道 ID 格式：@channel_name 或 -100xxxxxxxxx
-        
+        """
+
+    def connect(self, credentials):
+        telegram_config = {
+            'bot_token': credentials['bot_token'],
+            'channel_id': credentials['channel_id']
+        }
+
+        # 验证 bot token
+        ok, bot_info = self.probe(telegram_config)
+        if not ok:
+            return False, None, bot_info
+        return True, telegram_config, f"Bot: {bot_info['first_name']}"
+
+    def probe(self, platform_config):
+        return probe_telegram(platform_config)
+
+    def render_post_settings(self, uploaded_files):
+        telegram_format = st.selectbox("消息格式", ["普通文本", "HTML", "Markdown"], key="telegram_format")
+        disable_preview = st.checkbox("禁用链接预览", key="telegram_preview")
+        return {'telegram_format': telegram_format, 'disable_preview': disable_preview}
+
+    def render_preupload_settings(self):
+        staging_chat_id = st.text_input(
+            "Telegram 暂存会话 ID",
+            key="telegram_staging_chat",
+            help="Bot 可以发消息的私聊或私有群，用于获取 file_id，暂存消息会立即删除"
+        )
+        return {'telegram_staging_chat_id': staging_chat_id}
+
+    def compile_payload(self, content, post_settings):
+        content = super().compile_payload(content, post_settings)
+        # 为Telegram准备特殊格式
+        if post_settings.get('telegram_format') == "HTML":
+            content = content.replace('\n', '<br>')
+        return content
+
+    def validate(self, content, media_files, post_settings):
+        # 图片说明文字限制 1024 字符
+        if media_files and len(content) > 1024:
+            return '图片说明超过 1024 字符限制'
+        return super().validate(content, media_files, post_settings)
+
+    def preupload_media(self, platform_config, name, data, post_settings):
+        # Bot API 没有单独的上传接口：先发到暂存会话拿到 file_id，再删除暂存消息
+        staging_chat_id = post_settings.get('telegram_staging_chat_id')
+        if not staging_chat_id:
+            raise ValueError('未设置 Telegram 暂存会话 ID')
+        return preupload_telegram_photo(platform_config, staging_chat_id, name, data), None
+
+    def publish(self, platform_config, content, media_files=None, post_settings=None, media_handles=None):
+        return publish_to_telegram(content, platform_config, media_files, file_ids=media_handles)
+
+    def retract(self, platform_config, remote_posts):
+        # 同一批条目属于同一会话（见 start_bulk_operation）
+        chat_id = remote_posts[0].get('chat_id', platform_config['channel_id'])
+        message_ids = [message_id for remote_post in remote_posts for message_id in remote_post['ids']]
+        return delete_telegram_messages(platform_config, chat_id, message_ids)
+
+    def edit(self, platform_config, remote_post, content):
+        # 媒体组的说明文字在第一条消息上
+        return edit_telegram_message(
+            platform_config,
+            remote_post.get('chat_id', platform_config['channel_id']),
+            remote_post['ids'][0],
+            content,
+            caption=remote_post.get('media', False)
+        )
+
+class InstagramAdapter(PlatformAdapter):
+    name = 'instagram'
+    display_name = 'Instagram'
+    icon = '📸'
+    credential_key = 'access_token'
+    credential_fields = [
+        {'key': 'access_token', 'label': 'Access Token', 'secret': True},
+        {'key': 'user_id', 'label': 'Instagram User ID'}
+    ]
+    # 只能通过公开 URL 发布图片；平台要先抓取图片创建媒体容器，耗时不可控，只在后台发布
+    capabilities = {'max_media': 1, 'text_limit': 2200, 'requires_media': True, 'async_only': True, 'preupload': False,
+                    'retract': False, 'edit': False, 'retract_batch': 1, 'bulk_rate': None}
+    notice = "⚠️ Instagram 需要图片才能发布内容，纯文本无法发布"
+    guide = """
         ### 📸 Instagram API
         1. 访问 [developers.facebook.com](https://developers.facebook.com)
         2. 创建 Facebook 应用
         3. 添加 Instagram Basic Display 产品
         4. 获取用户访问令牌和用户 ID
         5. ⚠️ 注意：Instagram 只能发布带图片的内容
-        """)
-else:
-    # 发布功能
-    tab1, tab2, tab3 = st.tabs(["📝 发布内容", "📊 发布历史", "⚙️ 设置"])
-    
-    with tab1:
-        st.header("📝 创建新帖子")
-        
-        col1, col2 = st.columns([2, 1])
-        
-        with col1:
-            # 内容输入
-            post_content = st.text_area(
-                "帖子内容",
-                placeholder="写下您想要分享的内容...",
-                height=200,
-                max_chars=2000
-            )
-            
-            # 字符计数
-            char_count = len(post_content)
-            if char_count > 280:
-                st.warning(f"⚠️ 内容长度 {char_count} 字符，Twitter 限制 280 字符")
-            else:
-                st.info(f"📝 内容长度: {char_count} 字符")
-            
-            # 图片上传（如果PIL可用）
-            uploaded_files = None
-            if PIL_AVAILABLE:
-                uploaded_files = st.file_uploader(
-                    "上传图片",
-                    accept_multiple_files=True,
-                    type=['png', 'jpg', 'jpeg', 'gif']
-                )
-                
-                # 预览上传的图片
-                if uploaded_files:
-                    st.subheader("📷 图片预览")
-                    cols = st.columns(min(len(uploaded_files), 3))
-                    for i, uploaded_file in enumerate(uploaded_files):
-                        with cols[i % 3]:
-                            image = Image.open(uploaded_file)
-                            # 修复：使用 use_container_width 替代 use_column_width
-                            st.image(image, caption=uploaded_file.name, use_container_width=True)
-            else:
-                st.info("💡 安装 Pillow 包以支持图片上传功能")
-            
-            # 链接添加
-            link_url = st.text_input("添加链接（可选）", placeholder="https://...")
-        
-        with col2:
-            st.subheader("🎯 发布设置")
-            
-            # 选择平台
-            selected_platforms = []
-            for platform in st.session_state.authenticated_platforms:
-                platform_name = {
-                    'twitter': '🐦 Twitter',
-                    'telegram': '📨 Telegram', 
-                    'instagram': '📸 Instagram'
-                }.get(platform, platform.title())
-                
-                if st.checkbox(f"发布到 {platform_name}", value=True, key=f"select_{platform}"):
-                    selected_platforms.append(platform)
-            
-            # 发布模式
-            st.subheader("📤 发布模式")
-            publish_mode = st.radio(
-                "选择发布方式",
-                ["立即发布", "预览模式"],
-                help="预览模式不会实际发布，只显示将要发布的内容"
-            )
-            
-            # 平台特定设置
-            st.subheader("⚙️ 平台设置")
-            
-            # Twitter 特定设置
-            if 'twitter' in selected_platforms:
-                st.write("**🐦 Twitter 设置**")
-                add_hashtags = st.checkbox("自动添加热门标签", key="twitter_hashtags")
-                if add_hashtags:
-                    hashtags = st.text_input("标签（用空格分隔）", value="#社交媒体 #分享", key="twitter_hashtag_input")
-                else:
-                    hashtags = ""
-            
-            # Telegram 特定设置
-            if 'telegram' in selected_platforms:
-                st.write("**📨 Telegram 设置**")
-                telegram_format = st.selectbox("消息格式", ["普通文本", "HTML", "Markdown"], key="telegram_format")
-                disable_preview = st.checkbox("禁用链接预览", key="telegram_preview")
-            
-            # Instagram 特定设置
-            if 'instagram' in selected_platforms:
-                st.write("**📸 Instagram 设置**")
-                st.warning("⚠️ Instagram 需要图片才能发布")
-                if uploaded_files:
-                    st.success(f"✅ 已上传 {len(uploaded_files)} 张图片")
-                else:
-                    st.error("❌ 请上传至少一张图片")
-                
-                # 图片URL输入（用于Instagram API）
-                image_url_for_instagram = st.text_input(
-                    "图片公开URL（Instagram API需要）", 
-                    placeholder="https://example.com/image.jpg",
-                    help="Instagram API需要公开可访问的图片URL"
-                )
-        
-        # 发布按钮
-        button_text = "👀 预览发布内容" if publish_mode == "预览模式" else "🚀 发布到选中平台"
-        button_type = "secondary" if publish_mode == "预览模式" else "primary"
-        
-        if st.button(button_text, type=button_type, use_container_width=True):
-            if not post_content.strip():
-                st.error("请输入帖子内容")
-            elif not selected_platforms:
-                st.error("请至少选择一个发布平台")
-            else:
-                if publish_mode == "预览模式":
-                    # 预览模式
-                    st.header("👀 发布预览")
-                    for platform in selected_platforms:
-                        with st.expander(f"预览: {platform.title()}", expanded=True):
-                            preview_content = post_content
-                            
-                            # 添加平台特定内容
-                            if platform == 'twitter' and add_hashtags and hashtags:
-                                preview_content += f"\n\n{hashtags}"
-                            
-                            if link_url:
-                                preview_content += f"\n🔗 {link_url}"
-                            
-                            st.write("**发布内容:**")
-                            st.info(preview_content)
-                            
-                            if uploaded_files:
-                                st.write(f"**附件:** {len(uploaded_files)} 张图片")
-                                # 显示图片预览
-                                cols = st.columns(min(len(uploaded_files), 4))
-                                for i, uploaded_file in enumerate(uploaded_files):
-                                    with cols[i % 4]:
-                                        image = Image.open(uploaded_file)
-                                        st.image(image, use_container_width=True)
-                else:
-                    # 实际发布
-                    publish_results = {}
-                    
-                    # 发布到各个平台
-                    for platform in selected_platforms:
-                        with st.spinner(f"正在发布到 {platform.title()}..."):
-                            try:
-                                final_content = post_content
-                                
-                                # 添加平台特定内容
-                                if platform == 'twitter' and add_hashtags and hashtags:
-                                    final_content += f"\n\n{hashtags}"
-                                
-                                if link_url:
-                                    final_content += f"\n{link_url}"
-                                
-                                if platform == 'twitter':
-                                    result = publish_to_twitter(
-                                        final_content, 
-                                        st.session_state.authenticated_platforms['twitter'],
-                                        uploaded_files
-                                    )
-                                elif platform == 'telegram':
-                                    # 为Telegram准备特殊格式
-                                    telegram_content = final_content
-                                    if 'telegram_format' in locals():
-                                        if telegram_format == "HTML":
-                                            telegram_content = final_content.replace('\n', '<br>')
-                                        elif telegram_format == "Markdown":
-                                            telegram_content = final_content
-                                    
-                                    result = publish_to_telegram(
-                                        telegram_content, 
-                                        st.session_state.authenticated_platforms['telegram'],
-                                        uploaded_files
-                                    )
-                                elif platform == 'instagram':
-                                    # Instagram需要图片URL
-                                    instagram_config = st.session_state.authenticated_platforms['instagram'].copy()
-                                    if 'image_url_for_instagram' in locals() and image_url_for_instagram:
-                                        instagram_config['media_url'] = image_url_for_instagram
-                                        result = publish_to_instagram(final_content, instagram_config)
-                                    else:
-                                        result = {'success': False, 'error': '需要提供图片URL'}
-                                else:
-                                    result = {'success': False, 'error': 'Unsupported platform'}
-                                
-                                publish_results[platform] = result
-                                
-                            except Exception as e:
-                                publish_results[platform] = {'success': False, 'error': str(e)}
-                    
-                    # 显示发布结果
-                    st.header("📊 发布结果")
-                    success_count = 0
-                    for platform, result in publish_results.items():
-                        platform_icon = {'twitter': '🐦', 'telegram': '📨', 'instagram': '📸'}.get(platform, '📱')
-                        
-                        if result['success']:
-                            success_msg = f"✅ {platform_icon} {platform.title()}: 发布成功！"
-                            if 'media_count' in result and result['media_count'] > 0:
-                                success_msg += f" (包含 {result['media_count']} 张图片)"
-                            st.success(success_msg)
-                            
-                            if 'post_id' in result:
-                                st.code(f"帖子 ID: {result['post_id']}")
-                            success_count += 1
-                        else:
-                            st.error(f"❌ {platform_icon} {platform.title()}: {result['error']}")
-                    
-                    # 记录到历史
-                    if success_count > 0:
-                        history_record = {
-                            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            'content': post_content[:50] + "..." if len(post_content) > 50 else post_content,
-                            'platforms': [p for p, r in publish_results.items() if r['success']],
-                            'status': f"{success_count}/{len(selected_platforms)} 成功",
-                            'media_count': len(uploaded_files) if uploaded_files else 0
-                        }
-                        st.session_state.publish_history.append(history_record)
-                    
-                    # 成功提示
-                    if success_count == len(selected_platforms):
-                        st.balloons()
-                        st.success(f"🎉 所有平台发布成功！({success_count}/{len(selected_platforms)})")
-                    elif success_count > 0:
-                        st.warning(f"⚠️ 部分平台发布成功 ({success_count}/{len(selected_platforms)})")
-    
-    with tab2:
-        st.header("📊 发布历史")
-        
-        if st.session_state.publish_history:
-            st.info(f"共 {len(st.session_state.publish_history)} 条发布记录")
-            
-            for i, record in enumerate(reversed(st.session_state.publish_history)):
-                with st.expander(f"#{len(st.session_state.publish_history)-i} - {record['timestamp']} - {record['status']}"):
-                    col1, col2 = st.columns([2, 1])
-                    with col1:
-                        st.write(f"**内容**: {record['content']}")
-                        st.write(f"**平台**: {', '.join([p.title() for p in record['platforms']])}")
-                        if record.get('media_count', 0) > 0:
-                            st.write(f"**图片**: {record['media_count']} 张")
-                    with col2:
-                        st.write(f"**时间**: {record['timestamp']}")
-                        st.write(f"**状态**: {record['status']}")
-        else:
-            st.info("暂无发布历史")
-            st.markdown("发布第一条内容来开始记录历史！")
-    
-    with tab3:
-        st.header("⚙️ 应用设置")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("🔌 平台连接管理")
-            for platform in list(st.session_state.authenticated_platforms.keys()):
-                platform_icon = {'twitter': '🐦', 'telegram': '📨', 'instagram': '📸'}.get(platform, '📱')
-                col_a, col_b = st.columns([3, 1])
-                with col_a:
-                    st.write(f"{platform_icon} {platform.title()} - 已连接")
-                with col_b:
-                    if st.button(f"断开", key=f"disconnect_{platform}"):
-                        del st.session_state.authenticated_platforms[platform]
-                        st.rerun()
-        
-        with col2:
-            st.subheader("📊 数据管理")
-            if st.button("🗑️ 清空发布历史"):
-                st.session_state.publish_history = []
-                st.success("发布历史已清空")
-            
-            if st.button("🗑️ 清除所有API缓存", type="secondary"):
-                # 清除所有API凭据缓存
-                for key in st.session_state.api_credentials:
-                    st.session_state.api_credentials[key] = ''
-                st.success("所有API缓存已清除")
-                st.info("下次刷新页面时输入框将为空")
-                
-            if st.button("🔄 重置所有连接", type="secondary"):
-                st.session_state.authenticated_platforms = {}
-                st.session_state.publish_history = []
-                # 也清除API缓存
-                for key in st.session_state.api_credentials:
-                    st.session_state.api_credentials[key] = ''
-                st.success("所有设置和缓存已重置")
+        """
+
+    def connect(self, credentials):
+        instagram_config = {
+            'access_token': credentials['access_token'],
+            'user_id': credentials['user_id']
+        }
+
+        # 验证 Instagram token
+        ok, user_info = self.probe(instagram_config)
+        if not ok:
+            return False, None, user_info
+        return True, instagram_config, f"用户: @{user_info.get('username', 'Unknown')}"
+
+    def probe(self, platform_config):
+        return probe_instagram(platform_config)
+
+    def render_post_settings(self, uploaded_files):
+        # 图片URL输入（用于Instagram API）
+        image_url_for_instagram = st.text_input(
+            "图片公开URL（Instagram API需要）", 
+            placeholder="https://example.com/image.jpg",
+            help="Instagram API需要公开可访问的图片URL"
+        )
+        return {'instagram_image_url': image_url_for_instagram}
+
+    def validate(self, content, media_files, post_settings):
+        # Instagram需要图片URL，图片从该 URL 获取
+        if not post_settings.get('instagram_image_url'):
+            return '需要提供图片URL'
+        return super().validate(content, media_files or [post_settings['instagram_image_url']], post_settings)
+
+    def publish(self, platform_config, content, media_files=None, post_settings=None, media_handles=None):
+        instagram_config = platform_config.copy()
+        instagram_config['media_url'] = (post_settings or {}).get('instagram_image_url')
+        return publish_to_instagram(content, instagram_config)
+
+BUILTIN_PLATFORM_ADAPTERS = {
+    'twitter': TwitterAdapter,
+    'telegram': TelegramAdapter,
+    'instagram': InstagramAdapter
+}
+
+@st.cache_resource
+def discover_platform_entry_points():
+    """扫描已安装包声明的平台 entry point（只读元数据，不导入模块）"""
+    try:
+        from importlib.metadata import entry_points
+        try:
+            found = entry_points(group=PLATFORM_ENTRY_POINT_GROUP)
+        except TypeError:  # Python < 3.10
+            found = entry_points().get(PLATFORM_ENTRY_POINT_GROUP, [])
+    except Exception:
+        return {}
+    return {entry_point.name: entry_point for entry_point in found}
+
+@st.cache_resource
+def load_platform_adapter_class(platform):
+    """首次使用时才导入第三方平台适配器"""
+    entry_point = discover_platform_entry_points().get(platform)
+    return entry_point.load() if entry_point else None
+
+def list_platforms():
+    """所有可用平台名称（内置平台在前）"""
+    names = list(BUILTIN_PLATFORM_ADAPTERS)
+    names += [name for name in discover_platform_entry_points() if name not in names]
+    return names
+
+_platform_adapters = {}
+
+def get_adapter(platform):
+    """获取平台适配器实例，未知平台返回 None"""
+    adapters = _platform_adapters
+    if platform not in adapters:
+        adapter_class = BUILTIN_PLATFORM_ADAPTERS.get(platform)
+        if adapter_class is None:
+            try:
+                adapter_class = load_platform_adapter_class(platform)
+            except Exception as e:
+                st.warning(f"平台 {platform} 加载失败: {str(e)}")
+                adapter_class = None
+        if adapter_class is None:
+            return None
+        adapters[platform] = adapter_class()
+    return adapters[platform]
+
+def get_enabled_adapter(platform):
+    """已启用的平台适配器；当前会话没有启用或连接的第三方平台返回 None，不会导入其模块"""
+    if (
+        platform in BUILTIN_PLATFORM_ADAPTERS
+        or platform in st.session_state.get('authenticated_platforms', {})
+        or platform in st.session_state.get('enabled_platforms', [])
+    ):
+        return get_adapter(platform)
+    return None
+
+def get_platform_icon(platform):
+    """平台图标"""
+    adapter = get_enabled_adapter(platform)
+    return adapter.icon if adapter else PlatformAdapter.icon
+
+def get_platform_name(platform):
+    """平台显示名称；未启用的第三方平台显示 entry point 名称"""
+    adapter = get_enabled_adapter(platform)
+    return adapter.display_name if adapter else platform
+
+def get_platform_label(platform):
+    """带图标的平台名称"""
+    return f"{get_platform_icon(platform)} {get_platform_name(platform)}"
+
+def probe_platform(platform, platform_config):
+    """按平台执行连接探测"""
+    adapter = get_adapter(platform)
+    if adapter is None:
+        return False, 'Unsupported platform'
+    return adapter.probe(platform_config)
+
+# 内容模板系统
+# 占位符格式: {{变量名}}，platform/date/time 为内置变量
+# 标签、链接和 Telegram 格式仍由 build_platform_content 按平台设置统一追加
+TEMPLATE_PLACEHOLDER = re.compile(r"\{\{\s*([^{}\s]+)\s*\}\}")
+TEMPLATE_BUILTIN_VARS = ('platform', 'date', 'time')
+
+@functools.lru_cache(maxsize=256)
+def compile_template(source):
+    """把模板编译为 (格式串, 变量名元组)，编译结果按源文本缓存"""
+    names = []
+    parts = []
+    position = 0
+    for match in TEMPLATE_PLACEHOLDER.finditer(source):
+        # 普通文本中的花括号需要转义，避免被 str.format 解析
+        literal = source[position:match.start()]
+        parts.append(literal.replace('{', '{{').replace('}', '}}'))
+        parts.append('{%d}' % len(names))
+        names.append(match.group(1))
+        position = match.end()
+    parts.append(source[position:].replace('{', '{{').replace('}', '}}'))
+    return ''.join(parts), tuple(names)
+
+def get_template_source(template, platform=None):
+    """获取模板在指定平台下的文本，优先使用平台覆盖版本"""
+    if platform:
+        override = template.get('overrides', {}).get(platform)
+        if override:
+            return override
+    return template['body']
+
+def get_template_variables(template):
+    """列出模板（含所有平台覆盖）中需要用户填写的变量"""
+    sources = [template['body']] + list(template.get('overrides', {}).values())
+    variables = []
+    for source in sources:
+        for name in compile_template(source)[1]:
+            if name not in variables and name not in TEMPLATE_BUILTIN_VARS:
+                variables.append(name)
+    return variables
+
+def render_template(template, variables, platform=None):
+    """渲染模板，缺失的变量按空字符串处理"""
+    fmt, names = compile_template(get_template_source(template, platform))
+    return fmt.format(*[str(variables.get(name, '')) for name in names])
+
+def render_template_variants(template, rows, platform=None, base_variables=None):
+    """批量渲染模板变体，每行变量覆盖公共变量"""
+    fmt, names = compile_template(get_template_source(template, platform))
+    base_variables = base_variables or {}
+    variants = []
+    for row in rows:
+        values = []
+        for name in names:
+            value = row.get(name)
+            if value is None or value == '':
+                value = base_variables.get(name, '')
+            values.append(str(value))
+        variants.append(fmt.format(*values))
+    return variants
+
+def parse_variant_rows(csv_text):
+    """解析批量变体的 CSV 文本（首行为变量名）"""
+    if not csv_text.strip():
+        return []
+    reader = csv.DictReader(io.StringIO(csv_text.strip()))
+    return [
+        {key.strip(): (value or '').strip() for key, value in row.items() if key}
+        for row in reader
+    ]
+
+def get_builtin_template_variables(platform=None):
+    """内置模板变量"""
+    now = datetime.now()
+    return {
+        'platform': platform or '',
+        'date': now.strftime("%Y-%m-%d"),
+        'time': now.strftime("%H:%M")
+    }
+
+def build_post_variants(platforms, post_content, template=None, template_values=None, variant_rows=None):
+    """生成待发布的变体列表，每个变体为 {平台: 内容}"""
+    if not template:
+        return [{platform: post_content for platform in platforms}]
+
+    rows = variant_rows or [{}]
+    rendered = {}
+    for platform in platforms:
+        base_variables = dict(template_values or {})
+        base_variables.update(get_builtin_template_variables(platform))
+        rendered[platform] = render_template_variants(template, rows, platform, base_variables)
+    return [{platform: rendered[platform][i] for platform in platforms} for i in range(len(rows))]
+
+def build_platform_content(content, platform, post_settings):
+    """根据平台设置（标签、链接、消息格式）生成最终发布内容"""
+    adapter = get_adapter(platform)
+    return adapter.compile_payload(content, post_settings) if adapter else content
+
+def publish_to_platform(platform, content, platform_config, media_files=None, post_settings=None, media_handles=None):
+    """通过平台适配器校验并发布，返回统一格式的结果"""
+    post_settings = post_settings or {}
+    adapter = get_adapter(platform)
+    if adapter is None:
+        return {'success': False, 'error': 'Unsupported platform', 'retryable': False}
+
+    if media_files:
+        media_files = media_files[:adapter.capabilities.get('max_media') or len(media_files)]
+    error = adapter.validate(content, media_files, post_settings)
+    if error:
+        # 内容本身的问题，重试也不会成功
+        return {'success': False, 'error': error, 'retryable': False}
+    return adapter.publish(platform_config, content, media_files, post_settings, media_handles)
+
+def defer_to_outbox(platform, platform_config, content, media_files=None, post_settings=None):
+    """只能后台发布的平台（async_only）：校验通过后写入发件箱，由发件箱的后台线程发布，返回界面显示用的结果"""
+    post_settings = post_settings or {}
+    adapter = get_adapter(platform)
+    if media_files:
+        media_files = media_files[:adapter.capabilities.get('max_media') or len(media_files)]
+    error = adapter.validate(content, media_files, post_settings)
+    if error:
+        return {'success': False, 'error': error, 'retryable': False}
+    queued, outbox_info = enqueue_outbox(platform, platform_config, content, media_files, post_settings)
+    if not queued:
+        return {'success': False, 'error': f"{outbox_info}，未能加入后台发布队列", 'retryable': False}
+    # 下次渲染发件箱状态时立即提交，不等补发间隔
+    st.session_state.outbox_drained_at = 0
+    return {'success': False, 'pending': True, 'queued': True, 'error': ''}
+
+def is_delivery_unknown(result):
+    """失败时帖子是否可能已经发布（读超时、连接中断、5xx），这类失败不能自动补发"""
+    return bool(result.get('delivery_unknown')) or (result.get('status_code') or 0) >= 500
+
+def is_retryable_failure(result):
+    """发布失败是否值得稍后重试：优先看 retryable，其次看状态码（408、425、429、5xx），都没有时（如熔断）重试"""
+    if result.get('success'):
+        return False
+    if 'retryable' in result:
+        return bool(result['retryable'])
+    status_code = result.get('status_code')
+    if status_code is None:
+        return True
+    return status_code in RETRYABLE_STATUS_CODES or status_code >= 500
+
+# 发布数据统计
+# 汇总结构和累加逻辑见 multisync_store.record_publish_stat；配置共享存储时汇总保存在存储中，
+# 界面、发件箱补发、HTTP 接口和发布进程的发布都计入同一份汇总，不随会话重置
+def get_publish_stats():
+    """获取统计汇总"""
+    store = get_coordination_store()
+    if store is not None:
+        return store.get_publish_stats()
+    if st.session_state.publish_stats is None:
+        st.session_state.publish_stats = multisync_store.new_publish_stats()
+    return st.session_state.publish_stats
+
+def add_publish_stat(platform, result, latency):
+    """把一次平台发布结果计入统计（latency 单位为秒；未实际调用平台时为 None）"""
+    store = get_coordination_store()
+    if store is not None:
+        store.add_publish_stat(platform, result, latency)
+    else:
+        multisync_store.record_publish_stat(get_publish_stats(), platform, result, latency)
+
+def clear_publish_stats():
+    store = get_coordination_store()
+    if store is not None:
+        store.clear_publish_stats()
+    st.session_state.publish_stats = None
+
+def estimate_latency_percentile(latency_hist, percentile):
+    """根据延迟直方图估算分位数，返回所在区间的上界（毫秒）"""
+    total = sum(latency_hist)
+    if total == 0:
+        return None
+    threshold = total * percentile
+    running = 0
+    for i, count in enumerate(latency_hist):
+        running += count
+        if running >= threshold:
+            bounds = multisync_store.STATS_LATENCY_BOUNDS_MS
+            return bounds[i] if i < len(bounds) else float('inf')
+    return float('inf')
+
+def format_latency_bucket(index):
+    """延迟直方图区间的显示名称"""
+    bounds = multisync_store.STATS_LATENCY_BOUNDS_MS
+    if index == 0:
+        return f"≤{bounds[0]}ms"
+    if index < len(bounds):
+        return f"{bounds[index - 1]}-{bounds[index]}ms"
+    return f">{bounds[-1]}ms"
+
+# 平台熔断器
+# 按 平台+凭据 记录连续失败（含超慢请求），熔断期间直接失败，冷却后用连接探测做半开检查。
+# 配置共享存储时熔断器状态保存在存储中，HTTP 接口和发布进程的发布结果也会计入
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_SLOW_CALL_SECONDS = 15
+CIRCUIT_COOLDOWN_SECONDS = 60
+CIRCUIT_MAX_COOLDOWN_SECONDS = 600
+
+def get_circuit_key(platform, platform_config):
+    """熔断器键：平台名 + 凭据指纹（不保存明文凭据）"""
+    adapter = get_adapter(platform)
+    credential = str(platform_config.get(adapter.credential_key if adapter else '', ''))
+    fingerprint = hashlib.sha256(credential.encode('utf-8')).hexdigest()[:8]
+    return f"{platform}:{fingerprint}"
+
+def new_circuit():
+    return {
+        'state': 'closed',
+        'failures': 0,
+        'opened_at': 0.0,
+        'cooldown': CIRCUIT_COOLDOWN_SECONDS,
+        'last_error': ''
+    }
+
+def get_circuit(platform, platform_config):
+    """获取平台凭据对应的熔断器状态；修改状态要通过 update_circuit"""
+    key = get_circuit_key(platform, platform_config)
+    store = get_coordination_store()
+    if store is not None:
+        return store.get_circuit(key) or new_circuit()
+    return st.session_state.circuit_breakers.setdefault(key, new_circuit())
+
+def update_circuit(platform, platform_config, update):
+    """调用 update(circuit) 修改熔断器状态并返回修改后的状态；共享存储中的状态在写事务内读改写"""
+    store = get_coordination_store()
+    if store is not None:
+        return store.update_circuit(get_circuit_key(platform, platform_config), update, new_circuit())
+    circuit = get_circuit(platform, platform_config)
+    update(circuit)
+    return circuit
+
+def open_circuit(circuit, error):
+    """打开熔断器；连续重新打开时冷却时间加倍"""
+    if circuit['state'] == 'half_open':
+        circuit['cooldown'] = min(circuit['cooldown'] * 2, CIRCUIT_MAX_COOLDOWN_SECONDS)
+    circuit['state'] = 'open'
+    circuit['opened_at'] = time.time()
+    circuit['last_error'] = error
+
+def close_circuit(circuit):
+    """关闭熔断器并重置计数"""
+    circuit['state'] = 'closed'
+    circuit['failures'] = 0
+    circuit['cooldown'] = CIRCUIT_COOLDOWN_SECONDS
+    circuit['last_error'] = ''
+
+def get_circuit_retry_in(circuit):
+    """距离下一次半开探测的剩余秒数"""
+    return max(0, int(circuit['opened_at'] + circuit['cooldown'] - time.time()))
+
+def set_circuit_half_open(circuit):
+    circuit['state'] = 'half_open'
+
+def apply_circuit_result(circuit, result, latency):
+    """根据发布结果和耗时（秒）更新熔断器状态；内容校验失败等不可重试的失败与平台健康无关，不计入"""
+    if not result.get('success') and not is_retryable_failure(result):
+        return
+    slow_call = latency > CIRCUIT_SLOW_CALL_SECONDS
+    if result.get('success') and not slow_call:
+        close_circuit(circuit)
+        return
+
+    circuit['failures'] += 1
+    error = result.get('error') or f"响应过慢 ({latency:.1f}s)"
+    if circuit['failures'] >= CIRCUIT_FAILURE_THRESHOLD or circuit['state'] == 'half_open':
+        open_circuit(circuit, error)
+    else:
+        circuit['last_error'] = error
+
+def record_circuit_result(platform, platform_config, result, latency):
+    """把发布结果计入熔断器"""
+    update_circuit(platform, platform_config, lambda circuit: apply_circuit_result(circuit, result, latency))
+
+def circuit_allows_publish(platform, platform_config):
+    """检查熔断器是否放行，返回 (是否放行, 拒绝原因)；冷却结束时先执行半开探测"""
+    circuit = get_circuit(platform, platform_config)
+    if circuit['state'] == 'closed':
+        return True, ''
+
+    retry_in = get_circuit_retry_in(circuit)
+    if circuit['state'] == 'open' and retry_in > 0:
+        return False, f"熔断中: {retry_in}s 后重试（最近错误: {circuit['last_error']}）"
+
+    # 半开：用连接探测代替真实发布
+    update_circuit(platform, platform_config, set_circuit_half_open)
+    ok, info = probe_platform(platform, platform_config)
+    if ok:
+        update_circuit(platform, platform_config, close_circuit)
+        return True, ''
+    update_circuit(platform, platform_config, lambda circuit: open_circuit(circuit, info))
+    return False, f"熔断中: 探测失败（{info}）"
+
+# 离线发件箱
+# 发布失败（网络错误、平台故障、熔断中）的目标连同最终内容和图片一起写入本地磁盘，
+# 平台恢复后按入队顺序、限速补发；凭据不落盘，补发时使用当前已连接的同一凭据。
+# 补发前把条目原子地改名为 .inflight 认领，多个会话共用同一目录时不会重复补发
+OUTBOX_DIR = os.environ.get(
+    'MULTISYNC_OUTBOX_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.multisync_outbox')
+)
+OUTBOX_MAX_ENTRIES = 500
+OUTBOX_MAX_BYTES = 200 * 1024 * 1024
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_DRAIN_BATCH = 5  # 每次补发每个平台最多处理的条数
+OUTBOX_REPLAY_INTERVAL_SECONDS = 1.0  # 同一平台两次补发的最小间隔
+OUTBOX_DRAIN_INTERVAL_SECONDS = 30
+OUTBOX_STATUS_REFRESH_SECONDS = 5
+OUTBOX_CLAIM_TIMEOUT_SECONDS = 300  # 认领超过该时间未完成视为进程已退出
+
+def get_outbox_entry_path(entry_id):
+    return os.path.join(OUTBOX_DIR, f"{entry_id}.json")
+
+def get_outbox_claim_path(entry_id):
+    return os.path.join(OUTBOX_DIR, f"{entry_id}.inflight")
+
+def get_outbox_media_path(entry_id, index):
+    return os.path.join(OUTBOX_DIR, f"{entry_id}.media{index}")
+
+def write_outbox_file(path, data):
+    """先写临时文件再替换，避免中断时留下半个文件"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+def get_outbox_usage():
+    """发件箱当前的 (条目数, 占用字节数)"""
+    if not os.path.isdir(OUTBOX_DIR):
+        return 0, 0
+    count = 0
+    total_bytes = 0
+    with os.scandir(OUTBOX_DIR) as entries:
+        for entry in entries:
+            total_bytes += entry.stat().st_size
+            if entry.name.endswith(('.json', '.inflight')):
+                count += 1
+    return count, total_bytes
+
+def list_outbox(include_claimed=False):
+    """按入队顺序列出发件箱条目；include_claimed 时包含正在补发的条目（claimed 为 True）"""
+    if not os.path.isdir(OUTBOX_DIR):
+        return []
+    suffixes = ('.json', '.inflight') if include_claimed else ('.json',)
+    entries = []
+    for filename in sorted(os.listdir(OUTBOX_DIR)):
+        if not filename.endswith(suffixes):
+            continue
+        try:
+            with open(os.path.join(OUTBOX_DIR, filename), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            continue
+        entry['claimed'] = filename.endswith('.inflight')
+        entries.append(entry)
+    return entries
+
+def enqueue_outbox(platform, platform_config, content, media_files=None, post_settings=None, error='', auto_retry=True):
+    """把发布失败的目标写入发件箱，返回 (是否成功, 条目 ID 或错误信息)；auto_retry 为 False 时只能手动重试"""
+    media_blobs = []
+    for media_file in media_files or []:
+        media_file.seek(0)
+        media_blobs.append((media_file.name, media_file.read()))
+        media_file.seek(0)
+
+    entry_bytes = sum(len(data) for _, data in media_blobs) + len(content.encode('utf-8'))
+    count, total_bytes = get_outbox_usage()
+    if count >= OUTBOX_MAX_ENTRIES or total_bytes + entry_bytes > OUTBOX_MAX_BYTES:
+        return False, "发件箱已满"
+
+    os.makedirs(OUTBOX_DIR, exist_ok=True)
+    # ID 以纳秒时间戳开头，文件名排序即入队顺序
+    entry_id = f"{time.time_ns():020d}-{platform}"
+    for i, (_, data) in enumerate(media_blobs):
+        write_outbox_file(get_outbox_media_path(entry_id, i), data)
+
+    entry = {
+        'id': entry_id,
+        'platform': platform,
+        'circuit_key': get_circuit_key(platform, platform_config),
+        'content': content,
+        'media_names': [name for name, _ in media_blobs],
+        'post_settings': post_settings or {},
+        'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'attempts': 0,
+        'next_attempt_at': 0.0,
+        'last_error': error,
+        'auto_retry': auto_retry
+    }
+    write_outbox_file(get_outbox_entry_path(entry_id), json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+    return True, entry_id
+
+def save_outbox_entry(entry):
+    write_outbox_file(get_outbox_entry_path(entry['id']), json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+
+def remove_outbox_entry(entry_id):
+    """删除发件箱条目（含已认领的）及其图片"""
+    paths = [get_outbox_entry_path(entry_id), get_outbox_claim_path(entry_id)]
+    index = 0
+    while os.path.exists(get_outbox_media_path(entry_id, index)):
+        paths.append(get_outbox_media_path(entry_id, index))
+        index += 1
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def claim_outbox_entry(entry_id):
+    """原子地认领条目（改名为 .inflight），同一条目只有一个会话能认领成功"""
+    claim_path = get_outbox_claim_path(entry_id)
+    try:
+        os.rename(get_outbox_entry_path(entry_id), claim_path)
+    except FileNotFoundError:
+        return False
+    # 改名不更新修改时间，记录认领时间用于回收超时的认领
+    os.utime(claim_path)
+    return True
+
+def release_outbox_entry(entry):
+    """写回条目并解除认领；先写认领文件再改名回去，避免与其他会话的认领交错"""
+    claim_path = get_outbox_claim_path(entry['id'])
+    write_outbox_file(claim_path, json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+    os.replace(claim_path, get_outbox_entry_path(entry['id']))
+
+def recover_outbox_claims():
+    """认领后进程退出留下的 .inflight 条目，超时后放回队列"""
+    if not os.path.isdir(OUTBOX_DIR):
+        return
+    cutoff = time.time() - OUTBOX_CLAIM_TIMEOUT_SECONDS
+    with os.scandir(OUTBOX_DIR) as entries:
+        for entry in entries:
+            if entry.name.endswith('.inflight') and entry.stat().st_mtime < cutoff:
+                try:
+                    os.rename(entry.path, entry.path[:-len('.inflight')] + '.json')
+                except FileNotFoundError:
+                    pass
+
+def load_outbox_media(entry):
+    """把发件箱中的图片还原为可重复读取的文件对象"""
+    media_files = []
+    for i, name in enumerate(entry['media_names']):
+        with open(get_outbox_media_path(entry['id'], i), 'rb') as f:
+            media_file = io.BytesIO(f.read())
+        media_file.name = name
+        media_files.append(media_file)
+    return media_files
+
+def publish_outbox_entry(entry, platform_config):
+    """补发一个已认领的条目并更新发件箱文件，返回 (结果, 耗时)；可在后台线程调用，不访问 session state"""
+    publish_started = time.perf_counter()
+    try:
+        result = publish_to_platform(
+            entry['platform'],
+            entry['content'],
+            platform_config,
+            load_outbox_media(entry),
+            entry['post_settings']
+        )
+    except Exception as e:
+        result = get_exception_failure(e)
+    latency = time.perf_counter() - publish_started
+
+    if result['success']:
+        remove_outbox_entry(entry['id'])
+    else:
+        entry['attempts'] = entry['attempts'] + 1 if is_retryable_failure(result) else OUTBOX_MAX_ATTEMPTS
+        entry['last_error'] = result.get('error', '')
+        if is_delivery_unknown(result):
+            # 帖子可能已经发布，停止自动补发，等待人工确认
+            entry['auto_retry'] = False
+        entry['next_attempt_at'] = time.time() + min(30 * 2 ** entry['attempts'], 3600)
+        release_outbox_entry(entry)
+    return result, latency
+
+def record_outbox_replay(entry, platform_config, result, latency):
+    """补发结果计入熔断器、统计、发布历史和帖子索引"""
+    record_circuit_result(entry['platform'], platform_config, result, latency)
+    add_publish_stat(entry['platform'], result, latency)
+    if result['success']:
+        index_published_post(entry['content'], {entry['platform']: result})
+        add_publish_history({
+            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'content': entry['content'][:50] + "..." if len(entry['content']) > 50 else entry['content'],
+            'platforms': [entry['platform']],
+            'status': "发件箱补发成功",
+            'media_count': len(entry['media_names'])
+        })
+
+def replay_outbox_entry(entry, platform_config):
+    """手动补发一个发件箱条目；成功则移出发件箱，失败则按指数退避安排下次重试"""
+    if not claim_outbox_entry(entry['id']):
+        return {'success': False, 'error': '该条目正在由其他会话补发或已被处理'}
+    result, latency = publish_outbox_entry(entry, platform_config)
+    record_outbox_replay(entry, platform_config, result, latency)
+    return result
+
+def replay_outbox_batch(entries, platform_config, probe=False):
+    """后台线程：按顺序限速补发同一平台已认领的条目，失败即停止并放回其余条目
+
+    probe 为 True 时（熔断器冷却结束）先做半开探测，探测失败则放回全部条目；
+    返回 (探测结果 (是否成功, 信息) 或 None, [(条目, 结果, 耗时)])
+    """
+    probe_result = None
+    if probe:
+        probe_result = probe_platform(entries[0]['platform'], platform_config)
+        if not probe_result[0]:
+            for entry in entries:
+                release_outbox_entry(entry)
+            return probe_result, []
+
+    replays = []
+    for i, entry in enumerate(entries):
+        if replays and not replays[-1][1]['success']:
+            release_outbox_entry(entry)
+            continue
+        if i:
+            time.sleep(OUTBOX_REPLAY_INTERVAL_SECONDS)
+        result, latency = publish_outbox_entry(entry, platform_config)
+        replays.append((entry, result, latency))
+    return probe_result, replays
+
+@st.cache_resource
+def get_outbox_executor():
+    """自动补发使用的进程级线程池"""
+    return concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix='multisync-outbox')
+
+def collect_outbox_replays():
+    """把已完成的后台补发结果记入当前会话，返回 (补发成功条数, 是否仍有进行中的补发)"""
+    pending = []
+    succeeded = 0
+    for replay in st.session_state.get('outbox_replays', []):
+        if not replay['future'].done():
+            pending.append(replay)
+            continue
+        try:
+            probe_result, replays = replay['future'].result()
+        except Exception as e:
+            if replay['probe']:
+                # 探测中途出错：重新打开熔断器，避免一直停留在半开状态
+                error = str(e)
+                update_circuit(replay['platform'], replay['platform_config'], lambda circuit: open_circuit(circuit, error))
+            continue
+        if probe_result is not None:
+            if probe_result[0]:
+                update_circuit(replay['platform'], replay['platform_config'], close_circuit)
+            else:
+                update_circuit(
+                    replay['platform'], replay['platform_config'],
+                    lambda circuit: open_circuit(circuit, probe_result[1])
+                )
+        for entry, result, latency in replays:
+            record_outbox_replay(entry, replay['platform_config'], result, latency)
+            succeeded += result['success']
+    st.session_state.outbox_replays = pending
+    return succeeded, bool(pending)
+
+def drain_outbox(max_per_platform=OUTBOX_DRAIN_BATCH):
+    """认领已恢复平台的队首条目并提交后台补发；某平台队首不可补发时跳过该平台，保证顺序
+
+    这里在渲染时运行，不做网络请求：熔断冷却结束的平台把半开探测交给后台线程，与补发一起执行
+    """
+    now = time.time()
+    recover_outbox_claims()
+    batches = {}
+    probe_platforms = set()
+    blocked_platforms = set()
+    for entry in list_outbox(include_claimed=True):
+        platform = entry['platform']
+        if platform in blocked_platforms or len(batches.get(platform, [])) >= max_per_platform:
+            continue
+        if entry['claimed']:
+            # 该平台已有会话在补发，等它完成以免打乱顺序
+            blocked_platforms.add(platform)
+            continue
+        if entry['attempts'] >= OUTBOX_MAX_ATTEMPTS or not entry.get('auto_retry', True):
+            # 超过重试次数或可能已发布的条目等待人工处理，不阻塞后续条目
+            continue
+        platform_config = st.session_state.authenticated_platforms.get(platform)
+        if (
+            platform_config is None
+            or get_circuit_key(platform, platform_config) != entry['circuit_key']
+            or entry['next_attempt_at'] > now
+        ):
+            blocked_platforms.add(platform)
+            continue
+        if platform not in batches:
+            circuit = get_circuit(platform, platform_config)
+            if circuit['state'] == 'half_open' or (circuit['state'] == 'open' and get_circuit_retry_in(circuit) > 0):
+                # 冷却中，或其他地方正在探测
+                blocked_platforms.add(platform)
+                continue
+            if circuit['state'] == 'open':
+                probe_platforms.add(platform)
+        if not claim_outbox_entry(entry['id']):
+            # 其他会话正在补发该平台，跳过以免打乱顺序
+            blocked_platforms.add(platform)
+            continue
+        batches.setdefault(platform, []).append(entry)
+
+    executor = get_outbox_executor()
+    replays = st.session_state.setdefault('outbox_replays', [])
+    for platform, entries in batches.items():
+        platform_config = st.session_state.authenticated_platforms[platform]
+        probe = platform in probe_platforms
+        if probe:
+            update_circuit(platform, platform_config, set_circuit_half_open)
+        replays.append({
+            'platform': platform,
+            'platform_config': platform_config,
+            'probe': probe,
+            'future': executor.submit(replay_outbox_batch, entries, dict(platform_config), probe)
+        })
+    return sum(len(entries) for entries in batches.values())
+
+def auto_refresh_fragment(run_every):
+    """支持 st.fragment 时定时自动重跑该片段，否则随页面一起重跑"""
+    def decorator(func):
+        fragment = getattr(st, 'fragment', None)
+        return fragment(run_every=run_every)(func) if fragment else func
+    return decorator
+
+@auto_refresh_fragment(OUTBOX_STATUS_REFRESH_SECONDS)
+def render_outbox_status():
+    """侧边栏发件箱状态；补发在后台线程进行，这里只提交和收集结果"""
+    drained, replaying = collect_outbox_replays()
+    count, total_bytes = get_outbox_usage()
+    if not count and not drained:
+        return
+    if not replaying and time.time() - st.session_state.get('outbox_drained_at', 0) >= OUTBOX_DRAIN_INTERVAL_SECONDS:
+        st.session_state.outbox_drained_at = time.time()
+        replaying = drain_outbox() > 0
+    st.header("📮 发件箱")
+    if drained:
+        st.success(f"✅ 已补发 {drained} 条")
+    if replaying:
+        st.info("⏳ 正在后台补发…")
+    if count:
+        st.warning(f"待发送 {count} 条 | 占用 {total_bytes / 1024 / 1024:.1f}MB")
+        st.caption("在「📊 发布历史」中重试或取消")
+
+# 媒体预上传
+# 编辑内容时就在后台把图片上传到各已连接平台，发布时只需调用创建接口；
+# 句柄按 平台+凭据+文件内容 缓存，文件被移除或句柄过期时丢弃
+PREUPLOAD_MAX_WORKERS = 4
+PREUPLOAD_WAIT_SECONDS = 30  # 发布时等待进行中的预上传的最长时间
+PREUPLOAD_RETRY_SECONDS = 30  # 预上传失败后的重试间隔
+
+@st.cache_resource
+def get_preupload_executor():
+    """预上传使用的进程级线程池"""
+    return concurrent.futures.ThreadPoolExecutor(
+        max_workers=PREUPLOAD_MAX_WORKERS,
+        thread_name_prefix='multisync-preupload'
+    )
+
+def get_media_fingerprint(media_file):
+    """文件内容指纹，用于识别同一张图片；按 UploadedFile.file_id 缓存，每次上传只读取和计算一次"""
+    fingerprints = st.session_state.setdefault('media_fingerprints', {})
+    file_id = getattr(media_file, 'file_id', None)
+    if file_id in fingerprints:
+        return fingerprints[file_id]
+    
+    media_file.seek(0)
+    fingerprint = f"{hashlib.sha256(media_file.read()).hexdigest()[:16]}:{media_file.name}"
+    media_file.seek(0)
+    if file_id is not None:
+        fingerprints[file_id] = fingerprint
+    return fingerprint
+
+def get_preupload_key(platform, platform_config, fingerprint):
+    return f"{get_circuit_key(platform, platform_config)}|{fingerprint}"
+
+def preupload_needs_restart(preupload, post_settings):
+    """句柄已过期，或上传失败后超过重试间隔、发布设置（如暂存会话）已修改时需要重新上传"""
+    future = preupload['future']
+    if not future.done():
+        return False
+    if future.cancelled() or future.exception():
+        return (
+            preupload['post_settings'] != post_settings
+            or time.time() - preupload['submitted_at'] > PREUPLOAD_RETRY_SECONDS
+        )
+    expires_at = future.result()[1]
+    return expires_at is not None and expires_at < time.time()
+
+def sync_media_preuploads(media_files, post_settings):
+    """为当前文件在各已连接平台启动预上传，并丢弃已移除文件的句柄"""
+    preuploads = st.session_state.setdefault('media_preuploads', {})
+    executor = get_preupload_executor()
+    wanted = set()
+    
+    for platform, platform_config in st.session_state.authenticated_platforms.items():
+        adapter = get_adapter(platform)
+        if adapter is None or not adapter.capabilities.get('preupload'):
+            continue
+        max_media = adapter.capabilities.get('max_media') or len(media_files)
+        for media_file in media_files[:max_media]:
+            key = get_preupload_key(platform, platform_config, get_media_fingerprint(media_file))
+            wanted.add(key)
+            
+            preupload = preuploads.get(key)
+            if preupload is None or preupload_needs_restart(preupload, post_settings):
+                media_file.seek(0)
+                data = media_file.read()
+                media_file.seek(0)
+                # 后台线程不能访问 session state，提前复制所需参数
+                preuploads[key] = {
+                    'platform': platform,
+                    'name': media_file.name,
+                    'submitted_at': time.time(),
+                    'post_settings': dict(post_settings),
+                    'future': executor.submit(
+                        adapter.preupload_media, dict(platform_config), media_file.name, data, dict(post_settings)
+                    )
+                }
+    
+    # 文件已移除：取消未开始的任务，丢弃已有句柄和指纹
+    for key in list(preuploads):
+        if key not in wanted:
+            preuploads.pop(key)['future'].cancel()
+    file_ids = {getattr(media_file, 'file_id', None) for media_file in media_files}
+    fingerprints = st.session_state.setdefault('media_fingerprints', {})
+    for file_id in list(fingerprints):
+        if file_id not in file_ids:
+            del fingerprints[file_id]
+
+def get_preupload_status():
+    """预上传进度：(已完成, 失败, 总数)"""
+    preuploads = st.session_state.get('media_preuploads', {})
+    done = failed = 0
+    for preupload in preuploads.values():
+        if preupload['future'].done():
+            if preupload['future'].cancelled() or preupload['future'].exception():
+                failed += 1
+            else:
+                done += 1
+    return done, failed, len(preuploads)
+
+def get_preuploaded_media(platform, platform_config, media_files):
+    """获取平台全部文件的预上传句柄；有任何一个不可用时返回 None，发布时回退为正常上传"""
+    preuploads = st.session_state.get('media_preuploads', {})
+    adapter = get_adapter(platform)
+    if not media_files or not preuploads or adapter is None:
+        return None
+    
+    max_media = adapter.capabilities.get('max_media') or len(media_files)
+    entries = []
+    for media_file in media_files[:max_media]:
+        preupload = preuploads.get(get_preupload_key(platform, platform_config, get_media_fingerprint(media_file)))
+        if preupload is None:
+            return None
+        entries.append(preupload)
+    
+    # 上传仍在进行时等待完成，比重新上传更快
+    concurrent.futures.wait([entry['future'] for entry in entries], timeout=PREUPLOAD_WAIT_SECONDS)
+    handles = []
+    for entry in entries:
+        future = entry['future']
+        if not future.done() or future.cancelled() or future.exception():
+            return None
+        handle, expires_at = future.result()
+        if expires_at is not None and expires_at < time.time():
+            return None
+        handles.append(handle)
+    return handles
+
+# 批量撤回与编辑
+# 按帖子索引在后台线程中并行调用各平台的删除/编辑接口；每个凭据一个令牌桶限速，
+# 平台返回限流时按其要求的等待时间暂停该凭据的所有请求后重试
+BULK_MAX_WORKERS = 8
+BULK_MAX_RETRIES = 3
+BULK_REFRESH_SECONDS = 1
+POST_INDEX_DISPLAY_LIMIT = 200
+POST_STATE_LABELS = {'live': '已发布', 'edited': '已编辑', 'deleted': '已撤回'}
+
+class RateLimiter:
+    """线程安全的令牌桶：每 period 秒最多 calls 次"""
+
+    def __init__(self, calls, period):
+        self.capacity = calls
+        self.rate = calls / period
+        self.tokens = calls
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """平台要求等待时，让共用该限速器的所有线程至少等待 seconds 秒"""
+        with self.lock:
+            self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+@st.cache_resource
+def get_bulk_executor():
+    """批量操作使用的进程级线程池"""
+    return concurrent.futures.ThreadPoolExecutor(
+        max_workers=BULK_MAX_WORKERS,
+        thread_name_prefix='multisync-bulk'
+    )
+
+@st.cache_resource
+def get_rate_limiters():
+    """进程内共享的限速器，同一凭据的多个会话共用额度"""
+    return {}
+
+def get_rate_limiter(platform, platform_config):
+    adapter = get_adapter(platform)
+    calls, period = adapter.capabilities.get('bulk_rate') or (BULK_MAX_WORKERS, 1)
+    limiters = get_rate_limiters()
+    key = get_circuit_key(platform, platform_config)
+    if key not in limiters:
+        limiters[key] = RateLimiter(calls, period)
+    return limiters[key]
+
+def run_bulk_task(adapter, platform_config, limiter, action, remote_posts, content):
+    """在后台线程中执行一次删除或编辑调用，限流时重试；不能调用 st.*"""
+    for attempt in range(BULK_MAX_RETRIES + 1):
+        limiter.acquire()
+        try:
+            if action == 'retract':
+                result = adapter.retract(platform_config, remote_posts)
+            else:
+                result = adapter.edit(platform_config, remote_posts[0], content)
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        if result['success'] or not result.get('retry_after') or attempt == BULK_MAX_RETRIES:
+            return result
+        limiter.pause(result['retry_after'])
+
+def start_bulk_operation(action, posts, platforms, content=None):
+    """为选中帖子的各平台条目提交后台任务；撤回时同一会话的条目按 retract_batch 合并为一次调用"""
+    executor = get_bulk_executor()
+    tasks = []
+    skipped = []
+    batches = {}
+    
+    for post in posts:
+        for platform, remote_post in post['platforms'].items():
+            if platform not in platforms or remote_post['state'] == 'deleted':
+                continue
+            adapter = get_adapter(platform)
+            platform_config = st.session_state.authenticated_platforms.get(platform)
+            if adapter is None or not adapter.capabilities.get(action):
+                skipped.append((post, platform, "平台不支持该操作"))
+            elif platform_config is None:
+                skipped.append((post, platform, "平台未连接"))
+            elif remote_post.get('account') and remote_post['account'] != get_circuit_key(platform, platform_config):
+                skipped.append((post, platform, "当前连接的账号与发布时不同"))
+            elif action == 'retract':
+                batch_key = (platform, str(remote_post.get('chat_id')))
+                batches.setdefault(batch_key, []).append((post['post_id'], remote_post))
+            else:
+                final_content = build_platform_content(content, platform, {})
+                tasks.append({
+                    'platform': platform,
+                    'post_ids': [post['post_id']],
+                    'future': executor.submit(
+                        run_bulk_task, adapter, dict(platform_config), get_rate_limiter(platform, platform_config),
+                        action, [dict(remote_post)], final_content
+                    )
+                })
+    
+    for (platform, _), entries in batches.items():
+        adapter = get_adapter(platform)
+        platform_config = st.session_state.authenticated_platforms[platform]
+        limiter = get_rate_limiter(platform, platform_config)
+        batch_size = adapter.capabilities.get('retract_batch') or 1
+        chunk = []
+        chunk_ids = 0
+        # 按远端 ID 数分批：媒体组的多条消息必须在同一批中删除
+        for post_id, remote_post in entries + [(None, None)]:
+            if chunk and (post_id is None or chunk_ids + len(remote_post['ids']) > batch_size):
+                tasks.append({
+                    'platform': platform,
+                    'post_ids': [chunk_post_id for chunk_post_id, _ in chunk],
+                    'future': executor.submit(
+                        run_bulk_task, adapter, dict(platform_config), limiter,
+                        action, [dict(chunk_remote_post) for _, chunk_remote_post in chunk], None
+                    )
+                })
+                chunk = []
+                chunk_ids = 0
+            if post_id is not None:
+                chunk.append((post_id, remote_post))
+                chunk_ids += len(remote_post['ids'])
+    
+    st.session_state.bulk_operation = {
+        'action': action,
+        'content': content,
+        'tasks': tasks,
+        'skipped': skipped,
+        'started_at': time.time()
+    }
+
+def apply_bulk_results(operation):
+    """把已完成任务的结果写回帖子索引（每个任务只写一次）"""
+    for task in operation['tasks']:
+        if task.get('applied') or not task['future'].done():
+            continue
+        task['applied'] = True
+        if task['future'].cancelled() or not task['future'].result()['success']:
+            continue
+        if operation['action'] == 'retract':
+            changes = {'state': 'deleted', 'retracted_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        else:
+            changes = {'state': 'edited', 'content': operation['content'],
+                       'edited_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        for post_id in task['post_ids']:
+            update_post_index(post_id, task['platform'], changes)
+
+# 重跑性能分析
+# 记录每次页面重跑（或单个片段重跑）中各区块的耗时，在设置页查看中位数
+PROFILE_HISTORY_SIZE = 50
+
+def start_rerun_profile():
+    """开始记录一次完整页面重跑"""
+    st.session_state['_active_rerun_profile'] = {
+        'kind': 'app',
+        'started': time.perf_counter(),
+        'sections': {}
+    }
+
+def finish_rerun_profile():
+    """结束当前完整重跑的记录并保存"""
+    profile = st.session_state.pop('_active_rerun_profile', None)
+    if profile is not None:
+        save_rerun_profile(profile['kind'], profile['sections'], time.perf_counter() - profile['started'])
+
+def save_rerun_profile(kind, sections, total):
+    """保存一条重跑记录（耗时单位为毫秒），只保留最近若干条"""
+    profiles = st.session_state.setdefault('rerun_profiles', [])
+    profiles.append({
+        'kind': kind,
+        'sections': {name: seconds * 1000 for name, seconds in sections.items()},
+        'total': total * 1000
+    })
+    del profiles[:-PROFILE_HISTORY_SIZE]
+
+@contextlib.contextmanager
+def profile_section(name):
+    """统计区块耗时；不在完整重跑中时（片段单独重跑）单独记录一条"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        profile = st.session_state.get('_active_rerun_profile')
+        if profile is not None:
+            profile['sections'][name] = profile['sections'].get(name, 0) + elapsed
+        else:
+            save_rerun_profile(f'fragment:{name}', {name: elapsed}, elapsed)
+
+def profiled_fragment(section):
+    """把渲染函数包装为独立片段：片段内的交互只重跑该片段，并记录耗时"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_section(section):
+                return func(*args, **kwargs)
+        fragment = getattr(st, 'fragment', None)
+        return fragment(wrapper) if fragment else wrapper
+    return decorator
+
+def summarize_rerun_profiles(profiles):
+    """按重跑类型汇总各区块耗时中位数"""
+    summary = {}
+    for profile in profiles:
+        kind_summary = summary.setdefault(profile['kind'], {'count': 0, 'total': [], 'sections': {}})
+        kind_summary['count'] += 1
+        kind_summary['total'].append(profile['total'])
+        for name, elapsed in profile['sections'].items():
+            kind_summary['sections'].setdefault(name, []).append(elapsed)
+    return {
+        kind: {
+            'count': kind_summary['count'],
+            'median_total': statistics.median(kind_summary['total']),
+            'median_sections': {name: statistics.median(values) for name, values in kind_summary['sections'].items()}
+        }
+        for kind, kind_summary in summary.items()
+    }
+
+# 页面渲染
+@st.cache_resource
+def get_dependencies_status():
+    """依赖和平台适配器的可用状态（进程内不变，只计算一次）"""
+    dependencies_status = {
+        "✅ Streamlit": True,
+        "✅ Requests": True,
+        "📷 PIL/Pillow": PIL_AVAILABLE,
+    }
+    for platform, adapter_class in BUILTIN_PLATFORM_ADAPTERS.items():
+        adapter = get_adapter(platform)
+        requirement_name = adapter.requirement.split('>')[0].split('=')[0]
+        dependency_label = f"{adapter.label} ({requirement_name})" if requirement_name else adapter.label
+        dependencies_status[dependency_label] = adapter.is_available()
+    # 第三方平台只读取 entry point 元数据，首次使用时才导入
+    for platform, entry_point in discover_platform_entry_points().items():
+        if platform in BUILTIN_PLATFORM_ADAPTERS:
+            continue
+        distribution = getattr(entry_point, 'dist', None)
+        dependency_label = f"{get_platform_label(platform)} ({distribution.name})" if distribution else get_platform_label(platform)
+        dependencies_status[dependency_label] = True
+    return dependencies_status
+
+def render_dependency_status():
+    """侧边栏依赖状态"""
+    st.sidebar.header("📦 依赖状态")
+    dependencies_status = get_dependencies_status()
+
+    for dep, status in dependencies_status.items():
+        if status:
+            st.sidebar.success(dep)
+        else:
+            st.sidebar.error(dep + " - 未安装")
+
+    if not PIL_AVAILABLE:
+        st.sidebar.warning("⚠️ PIL 未安装，图片功能受限")
+
+@profiled_fragment("侧边栏")
+def render_platform_config():
+    """侧边栏平台配置和已连接平台"""
+    st.header("🔑 平台配置")
+    for notice in st.session_state.pop('sidebar_notices', []):
+        st.success(notice)
+    
+    for platform in list_platforms():
+        adapter = get_enabled_adapter(platform)
+        if adapter is None:
+            # 第三方平台在用户启用后才导入
+            st.subheader(get_platform_label(platform))
+            if st.button(f"启用 {get_platform_name(platform)}", key=f"load_{platform}"):
+                st.session_state.enabled_platforms.append(platform)
                 st.rerun()
+            continue
         
-        st.subheader("ℹ️ 应用信息")
-        st.info(f"""
-        **版本**: 1.1.0 (支持API缓存)
-        **已连接平台**: {len(st.session_state.authenticated_platforms)}
-        **发布记录**: {len(st.session_state.publish_history)} 条
-        **依赖状态**: {"✅ 完整" if all(dependencies_status.values()) else "⚠️ 部分缺失"}
-        **缓存状态**: {"✅ 已启用" if any(st.session_state.api_credentials.values()) else "❌ 无缓存"}
-        """)
+        st.subheader(adapter.label)
+        if not adapter.is_available():
+            st.error(f"❌ 需要安装 {adapter.requirement.split('>')[0]} 包")
+            st.info(f"在 requirements.txt 中添加: {adapter.requirement}")
+            continue
         
-        # 新增：修复说明
-        with st.expander("🔧 最新功能更新", expanded=False):
-            st.markdown("""
-            ### 🆕 v1.1.0 新功能:
-            1. **🔒 API密钥缓存**: API密钥自动保存到浏览器本地，刷新页面不丢失
-            2. **🗑️ 单独清除缓存**: 每个平台都可以单独清除API缓存
-            3. **🔧 缓存管理**: 在设置页面可以清除所有API缓存
-            4. **🔐 安全存储**: 使用浏览器localStorage安全存储敏感信息
+        with st.expander(f"{adapter.display_name} API 设置"):
+            credentials = {}
+            for field in adapter.credential_fields:
+                credential_key = f"{platform}_{field['key']}"
+                st.session_state.api_credentials.setdefault(credential_key, '')
+                help_text = "🔒 安全存储在浏览器本地"
+                if field.get('help'):
+                    help_text = f"{field['help']} | {help_text}"
+                # 使用缓存的值作为默认值
+                credentials[field['key']] = st.text_input(
+                    field['label'],
+                    type="password" if field.get('secret') else "default",
+                    key=f"{credential_key}_input",
+                    value=get_cached_credential(credential_key),
+                    placeholder=field.get('placeholder'),
+                    help=help_text
+                )
             
-            ### ✅ 已修复问题:
-            1. **图片上传到 Twitter**: 现在支持同时上传文字和图片到 Twitter (最多4张)
-            2. **图片上传到 Telegram**: 支持单张或多张图片发布 (最多10张)  
-            3. **弃用参数修复**: 将 `use_column_width` 更新为 `use_container_width`
-            4. **发布历史增强**: 现在会记录包含的图片数量
-            5. **错误处理改进**: 更详细的错误信息和状态反馈
+            if adapter.notice:
+                st.info(adapter.notice)
             
-            ### 🔒 安全说明:
-            - API密钥存储在您的浏览器本地，不会发送到任何服务器
-            - 可以随时清除缓存的API密钥
-            - 隐私模式/无痕浏览将不会保存缓存
+            col_a, col_b = st.columns(2)
+            with col_a:
+                if st.button(f"连接 {adapter.display_name}", key=f"connect_{platform}"):
+                    if all(credentials.values()):
+                        try:
+                            # 保存凭据
+                            for key, value in credentials.items():
+                                save_credential(f"{platform}_{key}", value)
+                            
+                            ok, platform_config, message = adapter.connect(credentials)
+                        except Exception as e:
+                            ok, platform_config, message = False, None, f"{adapter.display_name} 连接失败: {str(e)}"
+                        
+                        if ok:
+                            st.session_state.authenticated_platforms[platform] = platform_config
+                            store = get_coordination_store()
+                            if store is not None:
+                                st.session_state.shared_credential_handles[platform] = store.save_credentials(
+                                    platform, credentials
+                                )
+                            update_circuit(platform, platform_config, close_circuit)
+                            # 侧边栏是独立片段，连接成功后整页重跑以刷新主区域
+                            st.session_state.sidebar_notices = [
+                                f"✅ {adapter.display_name} 连接成功！{message}",
+                                "🔒 API密钥已安全保存到浏览器缓存"
+                            ]
+                            st.rerun()
+                        else:
+                            st.error(f"❌ {message}")
+                    else:
+                        st.warning(f"请填写所有 {adapter.display_name} API 凭据")
             
-            ### 📋 使用说明:
-            - **Twitter**: 支持文字+图片，自动处理媒体上传
-            - **Telegram**: 单图用 sendPhoto，多图用 sendMediaGroup
-            - **Instagram**: 仍需要提供公开图片URL (API限制)
-            - **API缓存**: 输入API后点击连接，会自动保存到浏览器缓存
-            """)
-        
-        # 缓存状态显示
-        with st.expander("🔍 当前缓存状态", expanded=False):
-            st.write("**已缓存的API凭据:**")
-            cache_status = {}
-            for key, value in st.session_state.api_credentials.items():
-                platform = key.split('_')[0]  # 获取平台名
-                if platform not in cache_status:
-                    cache_status[platform] = []
+            with col_b:
+                if st.button("🗑️ 清除缓存", key=f"clear_{platform}_cache"):
+                    for field in adapter.credential_fields:
+                        save_credential(f"{platform}_{field['key']}", '')
+                    st.success(f"{adapter.display_name} 缓存已清除")
+                    st.rerun()
+    
+    # 显示已连接平台
+    st.header("✅ 已连接平台")
+    for platform, platform_config in st.session_state.authenticated_platforms.items():
+        circuit = get_circuit(platform, platform_config)
+        if circuit['state'] == 'closed':
+            st.success(f"✅ {get_platform_name(platform)}")
+            if circuit['failures']:
+                st.caption(f"⚠️ 连续失败 {circuit['failures']}/{CIRCUIT_FAILURE_THRESHOLD}: {circuit['last_error']}")
+        else:
+            st.error(f"⛔ {get_platform_name(platform)} - 熔断中，{get_circuit_retry_in(circuit)}s 后探测")
+            st.caption(f"最近错误: {circuit['last_error']}")
+            if st.button("🔄 立即探测", key=f"probe_{platform}"):
+                ok, info = probe_platform(platform, platform_config)
+                if ok:
+                    update_circuit(platform, platform_config, close_circuit)
+                else:
+                    update_circuit(platform, platform_config, lambda circuit: open_circuit(circuit, info))
+                st.rerun()
+
+def render_sidebar():
+    """侧边栏"""
+    with profile_section("依赖状态"):
+        render_dependency_status()
+    with st.sidebar:
+        render_platform_config()
+        render_outbox_status()
+
+def render_api_guide():
+    """未连接平台时的提示和 API 获取指南"""
+    st.warning("请在侧边栏配置并连接至少一个社交媒体平台")
+    
+    # 显示API获取指南
+    with st.expander("📖 API 获取指南", expanded=True):
+        st.markdown("".join(
+            get_enabled_adapter(platform).guide for platform in list_platforms() if get_enabled_adapter(platform)
+        ))
+
+@profiled_fragment("发布内容")
+def render_composer():
+    """发布内容标签页"""
+    st.header("📝 创建新帖子")
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        # 内容模板
+        template_names = list(st.session_state.content_templates.keys())
+        selected_template_name = st.selectbox(
+            "🧩 内容模板",
+            ["不使用模板"] + template_names,
+            key="selected_template",
+            help="在「⚙️ 设置」中管理模板"
+        )
+        active_template = st.session_state.content_templates.get(selected_template_name)
+        template_values = {}
+        variant_rows = []
+
+        if active_template:
+            with st.expander("🧩 模板变量", expanded=True):
+                for name in get_template_variables(active_template):
+                    template_values[name] = st.text_input(f"{{{{{name}}}}}", key=f"template_var_{name}")
+
+                bulk_csv = st.text_area(
+                    "批量变体（可选）",
+                    placeholder="product,summary\n产品A,简介A\n产品B,简介B",
+                    help="CSV 格式，首行为变量名，每行生成一个变体；空值使用上方的变量",
+                    key="template_bulk_csv"
+                )
+                try:
+                    variant_rows = parse_variant_rows(bulk_csv)
+                except csv.Error as e:
+                    st.error(f"❌ CSV 解析失败: {str(e)}")
+                if variant_rows:
+                    st.info(f"📦 共 {len(variant_rows)} 个变体")
+
+            # 使用默认模板渲染内容（各平台覆盖版本在发布时渲染）
+            template_preview_values = dict(template_values)
+            template_preview_values.update(get_builtin_template_variables())
+            post_content = render_template(active_template, template_preview_values)
+            st.text_area("帖子内容（模板渲染）", value=post_content, height=200, disabled=True)
+        else:
+            # 内容输入
+            post_content = st.text_area(
+                "帖子内容",
+                placeholder="写下您想要分享的内容...",
+                height=200,
+                max_chars=2000,
+                key="post_content"
+            )
+        
+        # 字符计数
+        char_count = len(post_content)
+        if char_count > 280:
+            st.warning(f"⚠️ 内容长度 {char_count} 字符，Twitter 限制 280 字符")
+        else:
+            st.info(f"📝 内容长度: {char_count} 字符")
+        
+        # 图片上传（如果PIL可用）
+        uploaded_files = None
+        if PIL_AVAILABLE:
+            uploaded_files = st.file_uploader(
+                "上传图片",
+                accept_multiple_files=True,
+                type=['png', 'jpg', 'jpeg', 'gif']
+            )
+            
+            # 预览上传的图片
+            if uploaded_files:
+                st.subheader("📷 图片预览")
+                cols = st.columns(min(len(uploaded_files), 3))
+                for i, uploaded_file in enumerate(uploaded_files):
+                    with cols[i % 3]:
+                        image = Image.open(uploaded_file)
+                        # 修复：使用 use_container_width 替代 use_column_width
+                        st.image(image, caption=uploaded_file.name, use_container_width=True)
+        else:
+            st.info("💡 安装 Pillow 包以支持图片上传功能")
+        
+        # 链接添加
+        link_url = st.text_input("添加链接（可选）", placeholder="https://...")
+    
+    with col2:
+        st.subheader("🎯 发布设置")
+        
+        # 选择平台
+        selected_platforms = []
+        for platform in st.session_state.authenticated_platforms:
+            platform_name = get_platform_label(platform)
+            
+            if st.checkbox(f"发布到 {platform_name}", value=True, key=f"select_{platform}"):
+                selected_platforms.append(platform)
+        
+        # 发布模式
+        st.subheader("📤 发布模式")
+        publish_mode = st.radio(
+            "选择发布方式",
+            ["立即发布", "预览模式"],
+            help="预览模式不会实际发布，只显示将要发布的内容"
+        )
+        
+        # 平台特定设置
+        st.subheader("⚙️ 平台设置")
+        post_settings = {'link_url': link_url}
+        for platform in selected_platforms:
+            adapter = get_adapter(platform)
+            if adapter is None:
+                continue
+            st.write(f"**{adapter.label} 设置**")
+            if adapter.capabilities.get('requires_media'):
+                st.warning(f"⚠️ {adapter.display_name} 需要图片才能发布")
+                if uploaded_files:
+                    st.success(f"✅ 已上传 {len(uploaded_files)} 张图片")
+                else:
+                    st.error("❌ 请上传至少一张图片")
+            post_settings.update(adapter.render_post_settings(uploaded_files))
+        
+        # 媒体预上传
+        st.subheader("⚡ 媒体预上传")
+        preupload_enabled = st.checkbox(
+            "编辑时在后台预上传图片",
+            key="preupload_media",
+            help="选择图片后立即上传到已连接平台，发布时只需发送内容"
+        )
+        if preupload_enabled:
+            for platform in st.session_state.authenticated_platforms:
+                adapter = get_adapter(platform)
+                if adapter is not None and adapter.capabilities.get('preupload'):
+                    post_settings.update(adapter.render_preupload_settings())
+            if uploaded_files:
+                sync_media_preuploads(uploaded_files, post_settings)
+                done, failed, total = get_preupload_status()
+                st.caption(f"⚡ 预上传 {done}/{total} 完成" + (f"，{failed} 个失败（发布时将正常上传）" if failed else ""))
+            else:
+                sync_media_preuploads([], post_settings)
+        else:
+            # 关闭时丢弃全部预上传句柄
+            sync_media_preuploads([], post_settings)
+    
+    # 发布按钮
+    button_text = "👀 预览发布内容" if publish_mode == "预览模式" else "🚀 发布到选中平台"
+    button_type = "secondary" if publish_mode == "预览模式" else "primary"
+    
+    if st.button(button_text, type=button_type, use_container_width=True):
+        if not post_content.strip():
+            st.error("请输入帖子内容")
+        elif not selected_platforms:
+            st.error("请至少选择一个发布平台")
+        else:
+            post_variants = build_post_variants(
+                selected_platforms, post_content, active_template, template_values, variant_rows
+            )
+            
+            if publish_mode == "预览模式":
+                # 预览模式
+                st.header("👀 发布预览")
+                if len(post_variants) > 1:
+                    st.info(f"📦 共 {len(post_variants)} 个变体，以下为第一个变体的预览")
+                for platform in selected_platforms:
+                    with st.expander(f"预览: {get_platform_name(platform)}", expanded=True):
+                        # 预览内容与实际发布内容一致
+                        preview_content = build_platform_content(post_variants[0][platform], platform, post_settings)
+                        
+                        st.write("**发布内容:**")
+                        st.info(preview_content)
+                        
+                        preview_error = get_adapter(platform).validate(preview_content, uploaded_files, post_settings)
+                        if preview_error:
+                            st.warning(f"⚠️ {preview_error}")
+                        
+                        if uploaded_files:
+                            st.write(f"**附件:** {len(uploaded_files)} 张图片")
+                            # 显示图片预览
+                            cols = st.columns(min(len(uploaded_files), 4))
+                            for i, uploaded_file in enumerate(uploaded_files):
+                                with cols[i % 4]:
+                                    image = Image.open(uploaded_file)
+                                    st.image(image, use_container_width=True)
+            else:
+                # 实际发布；先确认共享凭据没有在其他会话中被删除或替换
+                sync_shared_connections()
+                disconnected = [p for p in selected_platforms if p not in st.session_state.authenticated_platforms]
+                if disconnected:
+                    st.error(f"共享凭据已被删除或替换，请重新连接: {', '.join(map(get_platform_name, disconnected))}")
+                    return
+                bulk_mode = len(post_variants) > 1
+                bulk_progress = st.progress(0.0, text="批量发布中...") if bulk_mode else None
+                variant_results = []
                 
-                if value:  # 如果有值
-                    masked_value = f"{value[:4]}...{value[-4:]}" if len(value) > 8 else "****"
-                    cache_status[platform].append(f"✅ {key.split('_', 1)[1]}: {masked_value}")
+                for variant_index, variant in enumerate(post_variants):
+                    publish_results = {}
+                    
+                    # 发布到各个平台
+                    for platform in selected_platforms:
+                        with st.spinner(f"正在发布到 {get_platform_name(platform)}..."):
+                            platform_config = st.session_state.authenticated_platforms[platform]
+                            final_content = build_platform_content(variant[platform], platform, post_settings)
+                            if get_adapter(platform).capabilities.get('async_only'):
+                                # 后台发布的结果由发件箱计入熔断器、统计和发布历史
+                                publish_results[platform] = defer_to_outbox(
+                                    platform, platform_config, final_content, uploaded_files, post_settings
+                                )
+                                continue
+                            allowed, circuit_error = circuit_allows_publish(platform, platform_config)
+                            publish_latency = None
+                            if not allowed:
+                                # 熔断期间直接失败，不再等待故障平台；没有调用平台，不计入延迟
+                                publish_results[platform] = {'success': False, 'error': circuit_error, 'deferred': True}
+                            else:
+                                publish_started = time.perf_counter()
+                                try:
+                                    media_handles = None
+                                    if preupload_enabled:
+                                        media_handles = get_preuploaded_media(platform, platform_config, uploaded_files)
+                                    publish_results[platform] = publish_to_platform(
+                                        platform,
+                                        final_content,
+                                        platform_config,
+                                        uploaded_files,
+                                        post_settings,
+                                        media_handles
+                                    )
+                                except Exception as e:
+                                    publish_results[platform] = get_exception_failure(e)
+                                publish_latency = time.perf_counter() - publish_started
+                                record_circuit_result(
+                                    platform,
+                                    platform_config,
+                                    publish_results[platform],
+                                    publish_latency
+                                )
+                            add_publish_stat(
+                                platform,
+                                publish_results[platform],
+                                publish_latency
+                            )
+                            
+                            # 可重试的失败写入发件箱，平台恢复后自动补发；可能已发布的只能手动重试
+                            if is_retryable_failure(publish_results[platform]):
+                                queued, outbox_info = enqueue_outbox(
+                                    platform,
+                                    platform_config,
+                                    final_content,
+                                    uploaded_files,
+                                    post_settings,
+                                    publish_results[platform]['error'],
+                                    auto_retry=not is_delivery_unknown(publish_results[platform])
+                                )
+                                publish_results[platform]['queued'] = queued
+                                if not queued:
+                                    publish_results[platform]['error'] += f"（{outbox_info}，未能加入发件箱）"
+                    
+                    if bulk_mode:
+                        bulk_progress.progress(
+                            (variant_index + 1) / len(post_variants),
+                            text=f"批量发布中... {variant_index + 1}/{len(post_variants)}"
+                        )
+                    variant_results.append(publish_results)
+                    
+                    # 记录到历史
+                    success_count = sum(1 for result in publish_results.values() if result['success'])
+                    pending_count = sum(1 for result in publish_results.values() if result.get('pending'))
+                    if success_count > 0:
+                        record_content = variant[selected_platforms[0]]
+                        history_status = f"{success_count}/{len(selected_platforms)} 成功"
+                        if pending_count:
+                            history_status += f"，{pending_count} 个后台发布"
+                        history_record = {
+                            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                            'content': record_content[:50] + "..." if len(record_content) > 50 else record_content,
+                            'platforms': [p for p, r in publish_results.items() if r['success']],
+                            'status': history_status,
+                            'media_count': len(uploaded_files) if uploaded_files else 0
+                        }
+                        add_publish_history(history_record)
+                        index_published_post(record_content, publish_results)
+                
+                # 发布改变了历史、帖子索引、统计和熔断状态，结果存入会话后整页重跑，
+                # 让片段之外的标签页和侧边栏一起刷新
+                st.session_state.last_publish_results = variant_results
+                st.rerun()
+    
+    render_publish_results()
+
+def render_publish_results():
+    """显示上一次发布的结果（只显示一次）"""
+    variant_results = st.session_state.pop('last_publish_results', None)
+    if not variant_results:
+        return
+    
+    bulk_mode = len(variant_results) > 1
+    published_variants = 0
+    for variant_index, publish_results in enumerate(variant_results):
+        # 显示发布结果
+        if bulk_mode:
+            st.subheader(f"📦 变体 #{variant_index + 1}")
+        else:
+            st.header("📊 发布结果")
+        success_count = 0
+        pending_count = 0
+        for platform, result in publish_results.items():
+            platform_label = get_platform_label(platform)
+            
+            if result.get('pending'):
+                st.info(f"⏳ {platform_label}: 已加入后台发布队列，结果见侧边栏发件箱和发布历史")
+                pending_count += 1
+            elif result['success']:
+                success_msg = f"✅ {platform_label}: 发布成功！"
+                if 'media_count' in result and result['media_count'] > 0:
+                    success_msg += f" (包含 {result['media_count']} 张图片)"
+                st.success(success_msg)
+                
+                if 'post_id' in result:
+                    st.code(f"帖子 ID: {result['post_id']}")
+                success_count += 1
+            else:
+                st.error(f"❌ {platform_label}: {result['error']}")
+                if result.get('queued') and is_delivery_unknown(result):
+                    st.warning(f"📮 {get_platform_name(platform)} 可能已经发布，已加入发件箱，请在平台上确认后手动重试")
+                elif result.get('queued'):
+                    st.info(f"📮 {get_platform_name(platform)} 已加入发件箱，平台恢复后自动补发")
+        if success_count > 0:
+            published_variants += 1
+    
+    # 成功提示
+    if bulk_mode:
+        st.info(f"📦 批量发布完成: {published_variants}/{len(variant_results)} 个变体发布成功")
+    elif success_count == len(publish_results):
+        st.balloons()
+        st.success(f"🎉 所有平台发布成功！({success_count}/{len(publish_results)})")
+    elif success_count + pending_count == len(publish_results):
+        st.success(f"🎉 {success_count} 个平台发布成功，{pending_count} 个平台正在后台发布")
+    elif success_count > 0:
+        st.warning(f"⚠️ 部分平台发布成功 ({success_count}/{len(publish_results)})")
+
+@profiled_fragment("发布历史")
+def render_history():
+    """发布历史和发件箱标签页"""
+    outbox_entries = list_outbox(include_claimed=True)
+    if outbox_entries:
+        st.header(f"📮 发件箱（{len(outbox_entries)} 条待发送）")
+        for entry in outbox_entries:
+            exhausted = entry['attempts'] >= OUTBOX_MAX_ATTEMPTS
+            if entry['claimed']:
+                status_text = "正在补发"
+            elif not entry.get('auto_retry', True):
+                status_text = "可能已发布，请确认后手动重试"
+            elif exhausted:
+                status_text = "已停止自动重试"
+            else:
+                status_text = f"已重试 {entry['attempts']} 次"
+            with st.expander(f"{get_platform_label(entry['platform'])} - {entry['created_at']} - {status_text}"):
+                st.write(f"**内容**: {entry['content']}")
+                if entry['media_names']:
+                    st.write(f"**图片**: {', '.join(entry['media_names'])}")
+                st.write(f"**最近错误**: {entry['last_error']}")
+                if entry['claimed']:
+                    continue
+
+                col_a, col_b = st.columns(2)
+                with col_a:
+                    if st.button("🔄 立即重试", key=f"outbox_retry_{entry['id']}"):
+                        platform_config = st.session_state.authenticated_platforms.get(entry['platform'])
+                        if platform_config is None:
+                            st.error("平台未连接")
+                        elif get_circuit_key(entry['platform'], platform_config) != entry['circuit_key']:
+                            st.error("当前连接的凭据与入队时不同，无法补发")
+                        else:
+                            result = replay_outbox_entry(entry, platform_config)
+                            if result['success']:
+                                st.success("补发成功")
+                                st.rerun()
+                            else:
+                                st.error(f"补发失败: {result['error']}")
+                with col_b:
+                    if st.button("🗑️ 取消", key=f"outbox_cancel_{entry['id']}"):
+                        remove_outbox_entry(entry['id'])
+                        st.rerun()
+
+    st.header("📊 发布历史")
+
+    publish_history = get_publish_history()
+    if publish_history:
+        st.info(f"共 {len(publish_history)} 条发布记录")
+        
+        for i, record in enumerate(reversed(publish_history)):
+            with st.expander(f"#{len(publish_history)-i} - {record['timestamp']} - {record['status']}"):
+                col1, col2 = st.columns([2, 1])
+                with col1:
+                    st.write(f"**内容**: {record['content']}")
+                    st.write(f"**平台**: {', '.join([get_platform_name(p) for p in record['platforms']])}")
+                    if record.get('media_count', 0) > 0:
+                        st.write(f"**图片**: {record['media_count']} 张")
+                with col2:
+                    st.write(f"**时间**: {record['timestamp']}")
+                    st.write(f"**状态**: {record['status']}")
+    else:
+        st.info("暂无发布历史")
+        st.markdown("发布第一条内容来开始记录历史！")
+
+@profiled_fragment("帖子管理")
+def render_post_index():
+    """帖子索引和批量撤回/编辑标签页"""
+    st.header("🗂️ 帖子索引")
+    posts = get_post_index()
+    if not posts:
+        st.info("暂无已索引的帖子")
+        st.markdown("发布成功后会自动记录各平台的帖子 ID，可在此按活动批量撤回或编辑。")
+        return
+    
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        keyword = st.text_input("按内容筛选", key="post_index_keyword", placeholder="活动名称、链接或话题标签")
+    with col2:
+        all_platforms = sorted({platform for post in posts for platform in post['platforms']})
+        platforms = st.multiselect("平台", all_platforms, default=all_platforms, key="post_index_platforms")
+    include_retracted = st.checkbox("显示已撤回的帖子", key="post_index_include_retracted")
+    
+    matched = [
+        post for post in reversed(posts)
+        if keyword in post['content'] and any(
+            platform in platforms and (include_retracted or remote_post['state'] != 'deleted')
+            for platform, remote_post in post['platforms'].items()
+        )
+    ]
+    remote_count = sum(
+        1 for post in matched for platform, remote_post in post['platforms'].items()
+        if platform in platforms and remote_post['state'] != 'deleted'
+    )
+    st.caption(f"匹配 {len(matched)} 条帖子，其中 {remote_count} 个平台帖子可操作")
+    if matched:
+        st.dataframe([
+            {
+                '时间': post['timestamp'],
+                '内容': post['content'][:50] + "..." if len(post['content']) > 50 else post['content'],
+                '平台': ", ".join(
+                    f"{get_platform_label(platform)} {POST_STATE_LABELS[remote_post['state']]}"
+                    + (f"（{len(remote_post['ids'])} 条消息）" if len(remote_post['ids']) > 1 else "")
+                    for platform, remote_post in post['platforms'].items()
+                )
+            }
+            for post in matched[:POST_INDEX_DISPLAY_LIMIT]
+        ], use_container_width=True, hide_index=True)
+    
+    operation = st.session_state.get('bulk_operation')
+    running = operation is not None and not all(task['future'].done() for task in operation['tasks'])
+    action_label = st.radio("批量操作", ["撤回", "编辑"], horizontal=True, key="bulk_action")
+    action = 'retract' if action_label == "撤回" else 'edit'
+    new_content = None
+    if action == 'edit':
+        new_content = st.text_area(
+            "新内容",
+            key="bulk_edit_content",
+            help="Twitter 不支持编辑；Telegram 图片帖子修改的是说明文字"
+        )
+    confirm = st.checkbox(f"确认对匹配的 {len(matched)} 条帖子执行{action_label}", key="bulk_confirm")
+    if st.button(
+        f"🚀 开始批量{action_label}",
+        key="bulk_start",
+        disabled=running or not confirm or not matched or (action == 'edit' and not new_content)
+    ):
+        start_bulk_operation(action, matched, platforms, new_content)
+        st.success("已开始，进度见下方")
+    if running:
+        st.caption("上一个批量操作仍在进行中")
+
+@auto_refresh_fragment(BULK_REFRESH_SECONDS)
+def render_bulk_operation_status():
+    """批量操作进度，完成的结果同步写回帖子索引"""
+    operation = st.session_state.get('bulk_operation')
+    if operation is None:
+        return
+    apply_bulk_results(operation)
+    
+    action_label = "撤回" if operation['action'] == 'retract' else "编辑"
+    total = sum(len(task['post_ids']) for task in operation['tasks'])
+    done = succeeded = 0
+    failures = []
+    for task in operation['tasks']:
+        if not task['future'].done():
+            continue
+        done += len(task['post_ids'])
+        result = {'success': False, 'error': "已取消"} if task['future'].cancelled() else task['future'].result()
+        if result['success']:
+            succeeded += len(task['post_ids'])
+        else:
+            failures.append((task, result['error']))
+    
+    elapsed = time.time() - operation['started_at']
+    st.subheader(f"⏳ 批量{action_label}进度")
+    st.progress(done / total if total else 1.0, text=f"{done}/{total} 个平台帖子")
+    status = f"成功 {succeeded} | 失败 {done - succeeded} | 耗时 {elapsed:.1f}s"
+    if 0 < done < total:
+        status += f" | 预计剩余 {elapsed / done * (total - done):.0f}s"
+    st.caption(status)
+    
+    if failures:
+        with st.expander(f"❌ 失败 {len(failures)} 批"):
+            for task, error in failures:
+                st.write(f"{get_platform_label(task['platform'])}（{len(task['post_ids'])} 条）: {error}")
+    if operation['skipped']:
+        with st.expander(f"⏭️ 跳过 {len(operation['skipped'])} 个平台帖子"):
+            for post, platform, reason in operation['skipped']:
+                st.write(f"{get_platform_label(platform)} - {post['timestamp']}: {reason}")
+    
+    if done < total:
+        if st.button("⏹️ 取消未开始的任务", key="bulk_cancel"):
+            for task in operation['tasks']:
+                task['future'].cancel()
+    elif st.button("✅ 完成", key="bulk_dismiss"):
+        del st.session_state.bulk_operation
+        st.rerun()
+
+@profiled_fragment("统计")
+def render_analytics():
+    """发布数据统计标签页"""
+    st.header("📈 发布数据统计")
+    publish_stats = get_publish_stats()
+
+    if publish_stats['platforms']:
+        # 平台概览
+        metric_cols = st.columns(len(publish_stats['platforms']))
+        for col, (platform, platform_stats) in zip(metric_cols, publish_stats['platforms'].items()):
+            success_rate = platform_stats['success'] / platform_stats['total'] * 100
+            # 延迟只统计实际调用了平台的发布，熔断期间直接失败的不计入
+            measured = sum(platform_stats['latency_hist'])
+            with col:
+                st.metric(f"{get_platform_label(platform)} 成功率", f"{success_rate:.1f}%")
+                if measured:
+                    avg_latency = platform_stats['latency_sum_ms'] / measured
+                    p95_latency = estimate_latency_percentile(platform_stats['latency_hist'], 0.95)
+                    p95_text = (
+                        f"≤ {p95_latency}ms" if p95_latency != float('inf')
+                        else f"> {multisync_store.STATS_LATENCY_BOUNDS_MS[-1]}ms"
+                    )
+                    st.caption(f"共 {platform_stats['total']} 次 | 平均 {avg_latency:.0f}ms | P95 {p95_text}")
                 else:
-                    cache_status[platform].append(f"❌ {key.split('_', 1)[1]}: 未缓存")
+                    st.caption(f"共 {platform_stats['total']} 次 | 暂无延迟数据")
+
+        # 发布量趋势
+        st.subheader("📊 发布量趋势")
+        granularity_label = st.radio(
+            "时间粒度", ["分钟", "小时", "天"], index=1, horizontal=True, key="stats_granularity"
+        )
+        granularity = {'分钟': 'minute', '小时': 'hour', '天': 'day'}[granularity_label]
+        volume_data = [
+            {'时间': bucket_key, '成功': bucket['success'], '失败': bucket['total'] - bucket['success']}
+            for bucket_key, bucket in publish_stats['buckets'][granularity].items()
+        ]
+        st.bar_chart(volume_data, x='时间', y=['成功', '失败'])
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.subheader("⏱️ 延迟分布")
+            latency_data = [
+                dict(
+                    {'区间': format_latency_bucket(i)},
+                    **{get_platform_name(p): s['latency_hist'][i] for p, s in publish_stats['platforms'].items()}
+                )
+                for i in range(len(multisync_store.STATS_LATENCY_BOUNDS_MS) + 1)
+            ]
+            st.bar_chart(latency_data, x='区间')
+        with col2:
+            st.subheader("❌ 错误分类")
+            error_rows = [
+                {'平台': get_platform_name(platform), '错误': kind, '次数': count}
+                for platform, platform_stats in publish_stats['platforms'].items()
+                for kind, count in sorted(platform_stats['errors'].items(), key=lambda item: -item[1])
+            ]
+            if error_rows:
+                st.dataframe(error_rows, use_container_width=True, hide_index=True)
+            else:
+                st.success("暂无发布错误")
+
+        if st.button("🗑️ 重置统计数据", key="reset_stats"):
+            clear_publish_stats()
+            st.rerun()
+    else:
+        st.info("暂无统计数据")
+        st.markdown("发布内容后将自动汇总各平台的成功率、延迟和错误分布。")
+
+@profiled_fragment("设置")
+def render_settings():
+    """应用设置标签页"""
+    st.header("⚙️ 应用设置")
+    for notice in st.session_state.pop('settings_notices', []):
+        st.success(notice)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("🔌 平台连接管理")
+        for platform in list(st.session_state.authenticated_platforms.keys()):
+            col_a, col_b = st.columns([3, 1])
+            with col_a:
+                st.write(f"{get_platform_label(platform)} - 已连接")
+            with col_b:
+                if st.button(f"断开", key=f"disconnect_{platform}"):
+                    del st.session_state.authenticated_platforms[platform]
+                    st.rerun()
+    
+    with col2:
+        st.subheader("📊 数据管理")
+        if st.button("🗑️ 清空发布历史"):
+            clear_publish_history()
+            # 设置是独立片段，整页重跑以刷新发布历史标签页
+            st.session_state.settings_notices = ["发布历史已清空"]
+            st.rerun()
+        
+        if st.button("🗑️ 清除所有API缓存", type="secondary"):
+            # 清除所有API凭据缓存
+            for key in st.session_state.api_credentials:
+                st.session_state.api_credentials[key] = ''
+            st.success("所有API缓存已清除")
+            st.info("下次刷新页面时输入框将为空")
             
-            for platform, status_list in cache_status.items():
-                st.write(f"**{platform.title()}:**")
-                for status in status_list:
-                    st.write(f"  {status}")
-                st.write("")
-
-# 底部信息
-st.markdown("---")
-st.markdown(
-    """
-    <div style='text-align: center; color: gray;'>
-        📱 多平台社交媒体发布工具 v1.1.0 | Made with Streamlit<br>
-        🔒 所有数据和API密钥仅在您的浏览器中存储，确保隐私安全<br>
-        ✅ 已支持API缓存功能，刷新页面不丢失设置
-    </div>
-    """, 
-    unsafe_allow_html=True
-)
\ No newline at end of file
+        if st.button("🔄 重置所有连接", type="secondary"):
+            st.session_state.authenticated_platforms = {}
+            clear_publish_history()
+            clear_publish_stats()
+            # 也清除API缓存
+            for key in st.session_state.api_credentials:
+                st.session_state.api_credentials[key] = ''
+            st.success("所有设置和缓存已重置")
+            st.rerun()
+
+    store = get_coordination_store()
+    if store is not None:
+        st.subheader("🔐 共享凭据")
+        credential_handles = store.list_credential_handles()
+        with st.expander("管理共享凭据（影响所有副本和发布进程）", expanded=False):
+            if not credential_handles:
+                st.info("共享存储中没有凭据")
+            for platform, handle in credential_handles.items():
+                st.write(f"{get_platform_label(platform)}: `{handle}`")
+            if credential_handles:
+                forget_platform = st.selectbox("平台", list(credential_handles), key="shared_credential_platform")
+                confirm = st.checkbox(
+                    "确认删除：所有副本和发布进程在下一次发布前断开该平台，已打开的会话在下次刷新时断开",
+                    key="shared_credential_confirm"
+                )
+                if st.button("🗑️ 从共享存储删除", key="shared_credential_delete", disabled=not confirm):
+                    store.delete_credentials(forget_platform)
+                    # 丢弃进程内缓存的连接；其他会话和发布进程在下次运行或发布前检查句柄后断开
+                    connect_shared_credentials.clear()
+                    # 整页重跑：当前会话立即断开该平台，侧边栏和发布区同步刷新
+                    st.session_state.settings_notices = [f"已删除 {get_platform_label(forget_platform)} 的共享凭据"]
+                    st.rerun()
+
+    st.subheader("🧩 内容模板管理")
+    with st.expander("编辑内容模板", expanded=False):
+        st.caption("占位符格式 {{变量名}}；内置变量: " + ", ".join(TEMPLATE_BUILTIN_VARS))
+        edit_template_name = st.selectbox(
+            "选择模板",
+            ["➕ 新建模板"] + list(st.session_state.content_templates.keys()),
+            key="edit_template_name"
+        )
+        editing_template = st.session_state.content_templates.get(edit_template_name, {'body': '', 'overrides': {}})
+
+        template_name_input = st.text_input(
+            "模板名称",
+            value="" if edit_template_name == "➕ 新建模板" else edit_template_name,
+            key=f"template_name_{edit_template_name}"
+        )
+        template_body_input = st.text_area(
+            "默认内容",
+            value=editing_template['body'],
+            key=f"template_body_{edit_template_name}"
+        )
+        template_overrides_input = {}
+        for platform in list_platforms():
+            template_overrides_input[platform] = st.text_area(
+                f"{get_platform_label(platform)} 覆盖内容（留空使用默认内容）",
+                value=editing_template.get('overrides', {}).get(platform, ''),
+                key=f"template_override_{edit_template_name}_{platform}"
+            )
+
+        col_a, col_b = st.columns(2)
+        with col_a:
+            if st.button("💾 保存模板", key="save_template"):
+                if template_name_input.strip() and template_body_input.strip():
+                    if edit_template_name in st.session_state.content_templates and edit_template_name != template_name_input.strip():
+                        del st.session_state.content_templates[edit_template_name]
+                    st.session_state.content_templates[template_name_input.strip()] = {
+                        'body': template_body_input,
+                        'overrides': {p: v for p, v in template_overrides_input.items() if v.strip()}
+                    }
+                    st.success("模板已保存")
+                    st.rerun()
+                else:
+                    st.warning("请填写模板名称和默认内容")
+        with col_b:
+            if edit_template_name in st.session_state.content_templates:
+                if st.button("🗑️ 删除模板", key="delete_template"):
+                    del st.session_state.content_templates[edit_template_name]
+                    st.rerun()
+
+    st.subheader("ℹ️ 应用信息")
+    st.info(f"""
+    **版本**: 1.1.0 (支持API缓存)
+    **已连接平台**: {len(st.session_state.authenticated_platforms)}
+    **发布记录**: {len(get_publish_history())} 条
+    **依赖状态**: {"✅ 完整" if all(get_dependencies_status().values()) else "⚠️ 部分缺失"}
+    **缓存状态**: {"✅ 已启用" if any(st.session_state.api_credentials.values()) else "❌ 无缓存"}
+    """)
+    
+    # 新增：修复说明
+    with st.expander("🔧 最新功能更新", expanded=False):
+        st.markdown("""
+        ### 🆕 v1.1.0 新功能:
+        1. **🔒 API密钥缓存**: API密钥自动保存到浏览器本地，刷新页面不丢失
+        2. **🗑️ 单独清除缓存**: 每个平台都可以单独清除API缓存
+        3. **🔧 缓存管理**: 在设置页面可以清除所有API缓存
+        4. **🔐 安全存储**: 使用浏览器localStorage安全存储敏感信息
+        
+        ### ✅ 已修复问题:
+        1. **图片上传到 Twitter**: 现在支持同时上传文字和图片到 Twitter (最多4张)
+        2. **图片上传到 Telegram**: 支持单张或多张图片发布 (最多10张)  
+        3. **弃用参数修复**: 将 `use_column_width` 更新为 `use_container_width`
+        4. **发布历史增强**: 现在会记录包含的图片数量
+        5. **错误处理改进**: 更详细的错误信息和状态反馈
+        
+        ### 🔒 安全说明:
+        - API密钥存储在您的浏览器本地，不会发送到任何服务器
+        - 可以随时清除缓存的API密钥
+        - 隐私模式/无痕浏览将不会保存缓存
+        
+        ### 📋 使用说明:
+        - **Twitter**: 支持文字+图片，自动处理媒体上传
+        - **Telegram**: 单图用 sendPhoto，多图用 sendMediaGroup
+        - **Instagram**: 仍需要提供公开图片URL (API限制)
+        - **API缓存**: 输入API后点击连接，会自动保存到浏览器缓存
+        """)
+    
+    # 缓存状态显示
+    with st.expander("🔍 当前缓存状态", expanded=False):
+        st.write("**已缓存的API凭据:**")
+        cache_status = {}
+        for key, value in st.session_state.api_credentials.items():
+            platform = key.split('_')[0]  # 获取平台名
+            if platform not in cache_status:
+                cache_status[platform] = []
+            
+            if value:  # 如果有值
+                masked_value = f"{value[:4]}...{value[-4:]}" if len(value) > 8 else "****"
+                cache_status[platform].append(f"✅ {key.split('_', 1)[1]}: {masked_value}")
+            else:
+                cache_status[platform].append(f"❌ {key.split('_', 1)[1]}: 未缓存")
+        
+        for platform, status_list in cache_status.items():
+            st.write(f"**{get_platform_name(platform)}:**")
+            for status in status_list:
+                st.write(f"  {status}")
+            st.write("")
+
+    # 重跑耗时统计
+    with st.expander("⏱️ 重跑耗时", expanded=False):
+        profile_summary = summarize_rerun_profiles(st.session_state.get('rerun_profiles', []))
+        if not profile_summary:
+            st.info("暂无记录")
+        for kind, kind_summary in profile_summary.items():
+            kind_label = "完整重跑" if kind == 'app' else f"片段重跑 - {kind.split(':', 1)[1]}"
+            st.write(f"**{kind_label}**: {kind_summary['count']} 次，中位数 {kind_summary['median_total']:.1f}ms")
+            st.dataframe(
+                [{'区块': name, '中位数 (ms)': round(value, 1)} for name, value in kind_summary['median_sections'].items()],
+                use_container_width=True,
+                hide_index=True
+            )
+
+def render_footer():
+    """底部信息"""
+    st.markdown("---")
+    st.markdown(
+        """
+        <div style='text-align: center; color: gray;'>
+            📱 多平台社交媒体发布工具 v1.1.0 | Made with Streamlit<br>
+            🔒 所有数据和API密钥仅在您的浏览器中存储，确保隐私安全<br>
+            ✅ 已支持API缓存功能，刷新页面不丢失设置
+        </div>
+        """, 
+        unsafe_allow_html=True
+    )
+
+def main():
+    start_rerun_profile()
+    try:
+        # 页面配置
+        st.set_page_config(
+            page_title="多平台发布工具",
+            page_icon="📱",
+            layout="wide",
+            initial_sidebar_state="expanded"
+        )
+        init_session_state()
+        sync_shared_connections()
+        
+        with profile_section("页面头部"):
+            # 添加JavaScript代码来处理浏览器缓存
+            st.markdown(BROWSER_CACHE_SCRIPT, unsafe_allow_html=True)
+            
+            # 应用标题
+            st.title("📱 多平台社交媒体发布工具")
+            st.markdown("*无需第三方服务，直接连接各平台API*")
+        
+        render_sidebar()
+        
+        # 主内容区域
+        if not st.session_state.authenticated_platforms:
+            render_api_guide()
+        else:
+            # 发布功能
+            tab1, tab2, tab3, tab4, tab5 = st.tabs(["📝 发布内容", "📊 发布历史", "🗂️ 帖子管理", "📈 统计", "⚙️ 设置"])
+            with tab1:
+                render_composer()
+            with tab2:
+                render_history()
+            with tab3:
+                render_post_index()
+                render_bulk_operation_status()
+            with tab4:
+                render_analytics()
+            with tab5:
+                render_settings()
+        
+        render_footer()
+    finally:
+        finish_rerun_profile()
+
+if __name__ == "__main__":
+    main()
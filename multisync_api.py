@@ -0,0 +1,661 @@
+"""多平台发布工具的 HTTP 发布接口
+
+与 Streamlit 界面共用 multisync.py 中的平台适配器和 publish_to_* 发布函数，
+供 CMS 钩子、发布流水线等系统调用。只依赖标准库 asyncio，无需额外安装 Web 框架。
+
+接口:
+    POST /v1/media              流式上传图片（原始请求体，文件名放在 X-Filename 头），返回 media_id
+    POST /v1/publish            提交发布任务，返回 202 和 job_id；支持 Idempotency-Key 头，
+                                同一键对应不同内容时返回 409
+    GET  /v1/jobs/{job_id}      查询任务状态和各平台结果
+    GET  /v1/history?limit=50   最近完成的任务
+    GET  /healthz               健康检查
+
+凭据:
+    --credentials 指定 JSON 文件，格式为 {平台: {凭据字段: 值}}，字段名与界面中的凭据字段一致；
+    也可以用环境变量 MULTISYNC_{平台}_{字段}（大写），例如 MULTISYNC_TELEGRAM_BOT_TOKEN。
+    设置 MULTISYNC_API_TOKEN 后，所有请求都需要携带 Authorization: Bearer <token>。
+
+多副本:
+    指定 --store（或环境变量 MULTISYNC_STORE）后，任务、凭据和发布历史保存在共享存储中，
+    多个接口副本和 multisync_worker.py 发布进程按租约领取任务，见 multisync_store.py。
+
+用法:
+    python multisync_api.py --host 127.0.0.1 --port 8600 --credentials credentials.json
+"""
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import hmac
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+import multisync
+import multisync_store
+
+MAX_JSON_BYTES = 1024 * 1024
+MAX_MEDIA_BYTES = 20 * 1024 * 1024
+MEDIA_TTL_SECONDS = 3600
+MAX_JOBS = 10000
+MAX_HISTORY = 1000
+IDEMPOTENCY_TTL_SECONDS = 24 * 3600
+BODY_CHUNK_SIZE = 64 * 1024
+STORE_POLL_SECONDS = 0.2
+DEFAULT_MEDIA_DIR = os.path.join(tempfile.gettempdir(), 'multisync_api_media')
+
+HTTP_REASONS = {
+    200: 'OK', 201: 'Created', 202: 'Accepted', 400: 'Bad Request', 401: 'Unauthorized',
+    404: 'Not Found', 405: 'Method Not Allowed', 409: 'Conflict', 411: 'Length Required',
+    413: 'Payload Too Large', 500: 'Internal Server Error'
+}
+
+
+class HTTPError(Exception):
+    """请求处理错误，转换为对应状态码的 JSON 响应"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    """解析后的 HTTP 请求；请求体按需流式读取"""
+
+    def __init__(self, method, target, headers, reader):
+        parts = urlsplit(target)
+        self.method = method
+        self.path = parts.path
+        self.query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        self.headers = headers
+        self.reader = reader
+        self.body_consumed = False
+
+    async def iter_body(self, limit):
+        """按块读取请求体，支持 Content-Length 和 chunked 编码；超过 limit 时返回 413"""
+        self.body_consumed = True
+        received = 0
+        if self.headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size_line = await self.reader.readline()
+                try:
+                    size = int(size_line.split(b';')[0].strip() or b'0', 16)
+                except ValueError:
+                    raise HTTPError(400, '无效的 chunked 编码')
+                if size == 0:
+                    # 跳过 trailer
+                    while (await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    return
+                received += size
+                if received > limit:
+                    raise HTTPError(413, '请求体过大')
+                chunk = await self.reader.readexactly(size)
+                await self.reader.readline()
+                yield chunk
+        else:
+            if 'content-length' not in self.headers:
+                raise HTTPError(411, '缺少 Content-Length')
+            try:
+                remaining = int(self.headers['content-length'])
+            except ValueError:
+                raise HTTPError(400, '无效的 Content-Length')
+            if remaining < 0:
+                raise HTTPError(400, '无效的 Content-Length')
+            if remaining > limit:
+                raise HTTPError(413, '请求体过大')
+            while remaining > 0:
+                chunk = await self.reader.read(min(BODY_CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise ConnectionError('连接提前关闭')
+                remaining -= len(chunk)
+                yield chunk
+
+    async def read_json(self):
+        chunks = [chunk async for chunk in self.iter_body(MAX_JSON_BYTES)]
+        try:
+            return json.loads(b''.join(chunks) or b'{}')
+        except ValueError:
+            raise HTTPError(400, '请求体不是有效的 JSON')
+
+    async def discard_body(self):
+        """丢弃未读取的请求体，保证长连接上的下一个请求能正确解析"""
+        if not self.body_consumed and ('content-length' in self.headers or 'transfer-encoding' in self.headers):
+            async for _ in self.iter_body(float('inf')):
+                pass
+
+
+class PlatformConnections:
+    """按需连接平台并复用连接，供多个发布线程共用"""
+
+    def __init__(self, credentials=None, store=None):
+        self.credentials = credentials or {}
+        self.store = store
+        self.platform_configs = {}
+        self.lock = threading.Lock()
+
+    def get_credentials(self, platform):
+        """凭据文件优先，其次是共享存储；环境变量可以覆盖单个字段"""
+        adapter = multisync.get_adapter(platform)
+        credentials = self.credentials.get(platform)
+        if credentials is None and self.store is not None:
+            credentials = self.store.get_credentials(platform)
+        credentials = dict(credentials or {})
+        for field in adapter.credential_fields:
+            env_name = f"MULTISYNC_{platform}_{field['key']}".upper()
+            if env_name in os.environ:
+                credentials[field['key']] = os.environ[env_name]
+        return credentials
+
+    def get(self, platform):
+        """首次使用时用适配器连接平台，之后按凭据句柄复用连接；
+        每次都重新读取凭据，共享存储中的凭据被删除或替换后不再使用旧连接"""
+        adapter = multisync.get_adapter(platform)
+        if adapter is None:
+            raise ValueError(f'不支持的平台: {platform}')
+        if not adapter.is_available():
+            raise ValueError(f'{adapter.display_name} 需要安装 {adapter.requirement}')
+        credentials = self.get_credentials(platform)
+        handle = multisync_store.get_credential_handle(platform, credentials)
+        with self.lock:
+            cached = self.platform_configs.get(platform)
+            if cached is not None and cached[0] == handle:
+                return cached[1]
+            self.platform_configs.pop(platform, None)
+            missing = [field['key'] for field in adapter.credential_fields if not credentials.get(field['key'])]
+            if missing:
+                raise ValueError(f"{adapter.display_name} 未配置凭据: {', '.join(missing)}")
+            ok, platform_config, message = adapter.connect(credentials)
+            if not ok:
+                raise ValueError(message)
+            self.platform_configs[platform] = (handle, platform_config)
+            return platform_config
+
+
+def get_media_path(media_dir, media_id):
+    if not media_id or not all(c.isalnum() for c in media_id):
+        raise ValueError(f'无效的 media_id: {media_id}')
+    return os.path.join(media_dir, media_id)
+
+
+def load_media(media_dir, media_ids):
+    """把已上传的图片读回为带文件名的文件对象"""
+    media_files = []
+    for media_id in media_ids:
+        path = get_media_path(media_dir, media_id)
+        with open(f"{path}.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(path, 'rb') as f:
+            media_file = io.BytesIO(f.read())
+        media_file.name = meta['name']
+        media_files.append(media_file)
+    return media_files
+
+
+def publish_job(job, connections, media_dir, record_result):
+    """依次发布到任务中的各平台
+
+    已有成功结果的平台会跳过（任务被其他进程接手时不重复发布）；
+    实际调用了平台的结果带有 latency_ms（耗时）和 account（熔断器键，即凭据指纹）；
+    record_result(platform, result) 返回 False 表示租约已失效，立即停止并返回 False。
+    """
+    media_error = None
+    media_files = None
+    if job.get('media_ids'):
+        try:
+            media_files = load_media(media_dir, job['media_ids'])
+        except (OSError, ValueError) as e:
+            media_error = f'图片不存在或已过期: {e}'
+
+    for platform in job['platforms']:
+        if job['results'].get(platform, {}).get('success'):
+            continue
+        if media_error:
+            result = {'success': False, 'error': media_error}
+        else:
+            try:
+                platform_config = connections.get(platform)
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            else:
+                started = time.perf_counter()
+                try:
+                    final_content = multisync.build_platform_content(job['content'], platform, job['post_settings'])
+                    result = multisync.publish_to_platform(
+                        platform, final_content, platform_config, media_files, job['post_settings']
+                    )
+                except Exception as e:
+                    result = multisync.get_exception_failure(e)
+                result['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+                result['account'] = multisync.get_circuit_key(platform, platform_config)
+        if not record_result(platform, result):
+            return False
+    return True
+
+
+def get_job_status(job):
+    success_count = sum(1 for result in job['results'].values() if result.get('success'))
+    if success_count == len(job['platforms']):
+        return 'succeeded'
+    return 'partial' if success_count else 'failed'
+
+
+def run_leased_job(store, connections, media_dir, job):
+    """在租约内发布任务：后台线程定期续约，租约被接手后不再写入结果"""
+    lease_lost = threading.Event()
+    finished = threading.Event()
+
+    def keep_lease():
+        while not finished.wait(multisync_store.LEASE_SECONDS / 3):
+            if not store.renew_lease(job['job_id'], job['lease_token']):
+                lease_lost.set()
+                return
+
+    def record_result(platform, result):
+        if lease_lost.is_set():
+            return False
+        job['results'][platform] = result
+        if not store.record_result(job['job_id'], job['lease_token'], platform, result):
+            return False
+        if 'account' in result:
+            # 与界面共用熔断器：接口发布的失败和恢复同样计入
+            latency = result['latency_ms'] / 1000
+            store.update_circuit(
+                result['account'],
+                lambda circuit: multisync.apply_circuit_result(circuit, result, latency),
+                multisync.new_circuit()
+            )
+        return True
+
+    keeper = threading.Thread(target=keep_lease, daemon=True)
+    keeper.start()
+    try:
+        completed = publish_job(job, connections, media_dir, record_result)
+    finally:
+        finished.set()
+        keeper.join()
+    if completed:
+        # 账号取发布时记录的凭据指纹，不再重新连接平台：连接失败或凭据已被替换都不能影响结束任务
+        accounts = {
+            platform: result['account']
+            for platform, result in job['results'].items() if result.get('success') and 'account' in result
+        }
+        post_record = multisync_store.new_post_record(job['content'], job['results'], accounts)
+        store.finish_job(job['job_id'], job['lease_token'], get_job_status(job), post_record)
+    return completed
+
+
+def run_store_worker(store, connections, media_dir, worker_id, stop_event, poll_interval=STORE_POLL_SECONDS):
+    """从共享存储领取任务并发布，直到 stop_event 被设置"""
+    last_pruned = 0
+    while not stop_event.is_set():
+        try:
+            job = store.claim_job(worker_id)
+            if job is None:
+                if time.time() - last_pruned > 3600:
+                    store.prune_jobs()
+                    last_pruned = time.time()
+                stop_event.wait(poll_interval)
+                continue
+            run_leased_job(store, connections, media_dir, job)
+        except Exception as e:
+            # 存储暂时不可用等错误：稍后重试，未完成的任务在租约过期后会被重新领取
+            print(f"⚠️ {worker_id}: {e}")
+            stop_event.wait(poll_interval)
+
+
+class PublishService:
+    """发布任务服务：接收请求并排队发布
+
+    未配置共享存储时任务保存在内存中，由本进程的线程池发布；
+    配置共享存储后任务写入存储，由本进程和其他副本、发布进程按租约领取。
+    """
+
+    def __init__(self, credentials=None, workers=8, media_dir=None, api_token=None, store=None):
+        self.api_token = api_token
+        self.media_dir = media_dir or DEFAULT_MEDIA_DIR
+        os.makedirs(self.media_dir, exist_ok=True)
+        self.store = store
+        self.connections = PlatformConnections(credentials, store)
+
+        self.workers = workers
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix='multisync-api')
+        self.queue = None
+        self.jobs = collections.OrderedDict()
+        self.history = collections.deque(maxlen=MAX_HISTORY)
+        self.idempotency_keys = {}
+        self.stop_event = threading.Event()
+
+    # ---- 媒体 ----
+
+    def get_media_path(self, media_id):
+        try:
+            return get_media_path(self.media_dir, media_id)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+
+    def cleanup_media(self):
+        """删除超过保留时间的图片"""
+        cutoff = time.time() - MEDIA_TTL_SECONDS
+        with os.scandir(self.media_dir) as entries:
+            for entry in entries:
+                if entry.stat().st_mtime < cutoff:
+                    try:
+                        os.remove(entry.path)
+                    except FileNotFoundError:
+                        pass
+
+    # ---- 任务 ----
+
+    def validate_payload(self, payload):
+        content = payload.get('content')
+        platforms = payload.get('platforms')
+        if not isinstance(content, str) or not content.strip():
+            raise HTTPError(400, 'content 不能为空')
+        if not isinstance(platforms, list) or not platforms:
+            raise HTTPError(400, 'platforms 必须是非空列表')
+        unknown = [p for p in platforms if p not in multisync.list_platforms()]
+        if unknown:
+            raise HTTPError(400, f"不支持的平台: {', '.join(map(str, unknown))}")
+        post_settings = payload.get('post_settings')
+        if post_settings is None:
+            post_settings = {}
+        if not isinstance(post_settings, dict):
+            raise HTTPError(400, 'post_settings 必须是对象')
+        media_ids = payload.get('media_ids')
+        if media_ids is None:
+            media_ids = []
+        if not isinstance(media_ids, list) or not all(isinstance(media_id, str) for media_id in media_ids):
+            raise HTTPError(400, 'media_ids 必须是字符串列表')
+        for media_id in media_ids:
+            if not os.path.exists(self.get_media_path(media_id)):
+                raise HTTPError(400, f'media_id 不存在或已过期: {media_id}')
+        return {
+            'content': content,
+            'platforms': platforms,
+            'post_settings': post_settings,
+            'media_ids': media_ids
+        }
+
+    def create_job(self, payload, idempotency_key=None):
+        """校验请求并创建任务；同一幂等键在有效期内返回同一个任务，请求内容不同时返回 409"""
+        job_payload = self.validate_payload(payload)
+        if self.store is not None:
+            try:
+                return self.store.enqueue_job(job_payload, idempotency_key)
+            except multisync_store.IdempotencyConflict:
+                raise HTTPError(409, 'Idempotency-Key 已用于内容不同的请求')
+
+        now = time.time()
+        if idempotency_key:
+            existing = self.idempotency_keys.get(idempotency_key)
+            if existing and existing[1] > now and existing[0] in self.jobs:
+                job = self.jobs[existing[0]]
+                if {field: job[field] for field in job_payload} != job_payload:
+                    raise HTTPError(409, 'Idempotency-Key 已用于内容不同的请求')
+                return job, False
+
+        job = {
+            'job_id': uuid.uuid4().hex,
+            'status': 'queued',
+            'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'finished_at': None,
+            'results': {},
+            **job_payload
+        }
+        self.jobs[job['job_id']] = job
+        # 只保留最近的任务，优先淘汰已完成的
+        while len(self.jobs) > MAX_JOBS:
+            oldest_id, oldest = next(iter(self.jobs.items()))
+            if oldest['status'] in ('queued', 'running'):
+                break
+            del self.jobs[oldest_id]
+        if idempotency_key:
+            self.idempotency_keys[idempotency_key] = (job['job_id'], now + IDEMPOTENCY_TTL_SECONDS)
+            if len(self.idempotency_keys) > MAX_JOBS:
+                self.idempotency_keys = {
+                    key: value for key, value in self.idempotency_keys.items() if value[1] > now
+                }
+        self.queue.put_nowait(job)
+        return job, True
+
+    def get_job(self, job_id):
+        return self.store.get_job(job_id) if self.store is not None else self.jobs.get(job_id)
+
+    def list_history(self, limit):
+        if self.store is not None:
+            return [self.summarize_job(job) for job in self.store.list_finished_jobs(limit)]
+        return list(self.history)[-limit:][::-1]
+
+    def run_job(self, job):
+        """在工作线程中依次发布到各平台"""
+        def record_result(platform, result):
+            job['results'][platform] = result
+            return True
+
+        publish_job(job, self.connections, self.media_dir, record_result)
+
+    async def worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            job['status'] = 'running'
+            try:
+                await loop.run_in_executor(self.executor, self.run_job, job)
+                job['status'] = get_job_status(job)
+            except Exception as e:
+                job['status'] = 'failed'
+                job['error'] = str(e)
+            job['finished_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.history.append(self.summarize_job(job))
+            self.queue.task_done()
+
+    async def media_janitor(self):
+        while True:
+            await asyncio.sleep(300)
+            await asyncio.get_running_loop().run_in_executor(None, self.cleanup_media)
+
+    @staticmethod
+    def summarize_job(job):
+        content = job['content']
+        return {
+            'job_id': job['job_id'],
+            'status': job['status'],
+            'created_at': job['created_at'],
+            'finished_at': job['finished_at'],
+            'content': content[:50] + "..." if len(content) > 50 else content,
+            'platforms': job['platforms'],
+            'results': {
+                platform: {key: value for key, value in result.items() if key in ('success', 'post_id', 'error')}
+                for platform, result in job['results'].items()
+            }
+        }
+
+    # ---- HTTP ----
+
+    async def dispatch(self, request):
+        if self.api_token and request.path != '/healthz':
+            # 常量时间比较，避免通过响应耗时逐字节猜出令牌
+            authorization = request.headers.get('authorization', '').encode('utf-8')
+            if not hmac.compare_digest(authorization, f'Bearer {self.api_token}'.encode('utf-8')):
+                raise HTTPError(401, '未授权')
+
+        if request.path == '/healthz':
+            queued = self.store.count_jobs('queued') if self.store is not None else self.queue.qsize()
+            return 200, {'status': 'ok', 'queued': queued}
+
+        if request.path == '/v1/publish':
+            if request.method != 'POST':
+                raise HTTPError(405, '只支持 POST')
+            payload = await request.read_json()
+            if not isinstance(payload, dict):
+                raise HTTPError(400, '请求体必须是 JSON 对象')
+            job, created = self.create_job(payload, request.headers.get('idempotency-key'))
+            return 202, {
+                'job_id': job['job_id'],
+                'status': job['status'],
+                'status_url': f"/v1/jobs/{job['job_id']}",
+                'duplicate': not created
+            }
+
+        if request.path == '/v1/media':
+            if request.method != 'POST':
+                raise HTTPError(405, '只支持 POST')
+            return 201, await self.receive_media(request)
+
+        if request.path.startswith('/v1/jobs/'):
+            if request.method != 'GET':
+                raise HTTPError(405, '只支持 GET')
+            job = self.get_job(request.path[len('/v1/jobs/'):])
+            if job is None:
+                raise HTTPError(404, '任务不存在')
+            return 200, self.summarize_job(job)
+
+        if request.path == '/v1/history':
+            if request.method != 'GET':
+                raise HTTPError(405, '只支持 GET')
+            try:
+                limit = max(1, min(int(request.query.get('limit', 50)), MAX_HISTORY))
+            except ValueError:
+                raise HTTPError(400, 'limit 必须是整数')
+            return 200, {'jobs': self.list_history(limit)}
+
+        raise HTTPError(404, '接口不存在')
+
+    async def receive_media(self, request):
+        """把请求体分块写入临时文件，避免整张图片驻留内存"""
+        media_id = uuid.uuid4().hex
+        path = self.get_media_path(media_id)
+        name = os.path.basename(request.headers.get('x-filename', '')) or f'{media_id}.jpg'
+        size = 0
+        try:
+            with open(path, 'wb') as f:
+                async for chunk in request.iter_body(MAX_MEDIA_BYTES):
+                    f.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        if size == 0:
+            os.remove(path)
+            raise HTTPError(400, '请求体为空')
+        with open(f"{path}.json", 'w', encoding='utf-8') as f:
+            json.dump({'name': name, 'size': size}, f, ensure_ascii=False)
+        return {'media_id': media_id, 'name': name, 'size': size}
+
+    async def handle_connection(self, reader, writer):
+        """处理一个连接上的多个请求（HTTP/1.1 长连接）"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                request = Request(method.upper(), target, headers, reader)
+                try:
+                    status, body = await self.dispatch(request)
+                    await request.discard_body()
+                except HTTPError as e:
+                    status, body = e.status, {'error': e.message}
+                    # 请求体未读完时无法继续复用连接
+                    headers['connection'] = 'close'
+                except Exception as e:
+                    status, body = 500, {'error': str(e)}
+                    headers['connection'] = 'close'
+
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host, port):
+        """启动 HTTP 服务和发布线程，返回 asyncio Server"""
+        self.queue = asyncio.Queue()
+        if self.store is not None:
+            worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+            self.worker_threads = [
+                threading.Thread(
+                    target=run_store_worker,
+                    args=(self.store, self.connections, self.media_dir, f"{worker_prefix}:{i}", self.stop_event),
+                    daemon=True
+                )
+                for i in range(self.workers)
+            ]
+            for thread in self.worker_threads:
+                thread.start()
+            self.background_tasks = []
+        else:
+            self.background_tasks = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+        self.background_tasks.append(asyncio.create_task(self.media_janitor()))
+        return await asyncio.start_server(self.handle_connection, host, port, backlog=1024)
+
+
+def load_credentials(path):
+    if not path:
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+async def serve(args):
+    service = PublishService(
+        credentials=load_credentials(args.credentials),
+        workers=args.workers,
+        media_dir=args.media_dir,
+        api_token=os.environ.get('MULTISYNC_API_TOKEN'),
+        store=multisync_store.open_store(args.store) if args.store else multisync_store.open_store_from_env()
+    )
+    server = await service.start(args.host, args.port)
+    print(f"📡 发布接口已启动: http://{args.host}:{args.port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多平台发布工具 HTTP 接口")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--workers', type=int, default=8, help="并发发布任务数（使用共享存储时可设为 0，只接收任务）")
+    parser.add_argument('--store', help="共享存储地址，默认读取环境变量 MULTISYNC_STORE")
+    parser.add_argument('--credentials', help="平台凭据 JSON 文件")
+    parser.add_argument('--media-dir', help="上传图片的临时目录")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,602 @@
+"""多副本共享的协调存储
+
+多个 Streamlit 副本、HTTP 接口和发布进程通过同一个存储共享发布任务、平台凭据、发布历史、
+发布统计和平台熔断器状态。
+任务以租约方式领取：领取时递增 lease_token，发布进程定期续约，写结果时校验 token，
+租约过期的任务会被其他进程接手；已成功的平台结果逐个落库，接手后跳过，避免重复发布。
+
+内置 SQLite 后端（WAL 模式，适合同一台机器上的多个进程）；其他后端可以通过
+multisync.stores 入口点注册，按存储地址的协议名加载，例如:
+
+    [project.entry-points."multisync.stores"]
+    redis = "my_package:RedisStore"
+
+存储地址示例: sqlite:///var/lib/multisync/store.db（也可以直接写文件路径）
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from importlib.metadata import entry_points
+
+LEASE_SECONDS = 30
+JOB_MAX_ATTEMPTS = 3
+JOB_RETENTION_SECONDS = 7 * 24 * 3600
+HISTORY_MAX_RECORDS = 5000
+
+# 发布统计：每次发布完成时增量更新汇总数据，统计页只读取汇总结果，不扫描发布历史
+STATS_LATENCY_BOUNDS_MS = (250, 500, 1000, 2000, 5000, 10000, 30000)
+STATS_BUCKET_FORMATS = {'minute': "%Y-%m-%d %H:%M", 'hour': "%Y-%m-%d %H:00", 'day': "%Y-%m-%d"}
+STATS_BUCKET_RETENTION = {'minute': 120, 'hour': 72, 'day': 90}
+STATS_MAX_ERROR_KINDS = 20
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    idempotency_key TEXT UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    results TEXT NOT NULL DEFAULT '{}',
+    lease_owner TEXT,
+    lease_token INTEGER NOT NULL DEFAULT 0,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at);
+CREATE TABLE IF NOT EXISTS credentials (
+    platform TEXT PRIMARY KEY,
+    handle TEXT NOT NULL,
+    credentials TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    record TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS posts (
+    post_id TEXT PRIMARY KEY,
+    record TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stats (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    rollup TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS circuits (
+    account TEXT PRIMARY KEY,
+    circuit TEXT NOT NULL
+);
+"""
+
+
+def get_credential_handle(platform, credentials):
+    """凭据句柄：平台名加凭据指纹，可以展示和记录，不泄露凭据本身"""
+    fingerprint = hashlib.sha256(json.dumps(credentials, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+    return f"{platform}:{fingerprint}"
+
+
+def new_post_record(content, results, accounts=None):
+    """帖子索引条目：一条逻辑帖子对应的各平台远端 ID
+
+    Telegram 媒体组的每条消息都会记录（message_ids），撤回时需要全部删除；
+    accounts 为 {平台: 凭据指纹}，批量操作时用来确认当前连接的是发布时的账号。
+    """
+    platforms = {}
+    for platform, result in results.items():
+        if not result.get('success') or result.get('post_id') in (None, ''):
+            continue
+        entry = {
+            'ids': list(result.get('message_ids') or [result['post_id']]),
+            'media': bool(result.get('media_count')),
+            'state': 'live'
+        }
+        if result.get('chat_id') is not None:
+            entry['chat_id'] = result['chat_id']
+        if accounts and platform in accounts:
+            entry['account'] = accounts[platform]
+        platforms[platform] = entry
+    return {
+        'post_id': uuid.uuid4().hex,
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'content': content,
+        'platforms': platforms
+    }
+
+
+def new_publish_stats():
+    """创建空的统计汇总"""
+    return {
+        'platforms': {},
+        'buckets': {granularity: {} for granularity in STATS_BUCKET_FORMATS}
+    }
+
+
+def classify_publish_error(error):
+    """把错误信息归并为有限的类别，避免错误统计无限增长"""
+    error = str(error or 'Unknown error')
+    match = re.match(r"HTTP (\d{3})", error)
+    if match:
+        return f"HTTP {match.group(1)}"
+    return error.split(':')[0].strip()[:60] or 'Unknown error'
+
+
+def record_publish_stat(stats, platform, result, latency, when=None):
+    """把一次平台发布结果累加到统计汇总（latency 单位为秒；未实际调用平台时为 None，不计入延迟）"""
+    when = when or datetime.now()
+    success = bool(result.get('success'))
+
+    platform_stats = stats['platforms'].setdefault(platform, {
+        'total': 0,
+        'success': 0,
+        'latency_sum_ms': 0.0,
+        'latency_max_ms': 0.0,
+        'latency_hist': [0] * (len(STATS_LATENCY_BOUNDS_MS) + 1),
+        'errors': {}
+    })
+    platform_stats['total'] += 1
+    if latency is not None:
+        latency_ms = latency * 1000
+        platform_stats['latency_sum_ms'] += latency_ms
+        platform_stats['latency_max_ms'] = max(platform_stats['latency_max_ms'], latency_ms)
+        hist_index = len(STATS_LATENCY_BOUNDS_MS)
+        for i, bound in enumerate(STATS_LATENCY_BOUNDS_MS):
+            if latency_ms <= bound:
+                hist_index = i
+                break
+        platform_stats['latency_hist'][hist_index] += 1
+
+    if success:
+        platform_stats['success'] += 1
+    else:
+        errors = platform_stats['errors']
+        kind = classify_publish_error(result.get('error'))
+        if kind not in errors and len(errors) >= STATS_MAX_ERROR_KINDS:
+            kind = '其他'
+        errors[kind] = errors.get(kind, 0) + 1
+
+    # 按分钟/小时/天滚动汇总，只保留最近的若干个时间桶
+    for granularity, fmt in STATS_BUCKET_FORMATS.items():
+        buckets = stats['buckets'][granularity]
+        bucket = buckets.setdefault(when.strftime(fmt), {'total': 0, 'success': 0})
+        bucket['total'] += 1
+        if success:
+            bucket['success'] += 1
+        while len(buckets) > STATS_BUCKET_RETENTION[granularity]:
+            del buckets[next(iter(buckets))]
+
+
+def format_timestamp(value):
+    return datetime.fromtimestamp(value).strftime("%Y-%m-%d %H:%M:%S") if value else None
+
+
+class IdempotencyConflict(Exception):
+    """幂等键已用于内容不同的任务"""
+
+
+class CoordinationStore:
+    """协调存储接口；任务以 dict 表示，字段同 HTTP 接口的任务状态"""
+
+    # ---- 任务 ----
+
+    def enqueue_job(self, payload, idempotency_key=None):
+        """创建任务，返回 (任务, 是否新建)；幂等键已存在时返回已有任务，内容不同时抛出 IdempotencyConflict"""
+        raise NotImplementedError
+
+    def claim_job(self, worker_id, lease_seconds=LEASE_SECONDS):
+        """领取最早的待处理任务（含租约过期的任务），返回带 lease_token 的任务或 None"""
+        raise NotImplementedError
+
+    def renew_lease(self, job_id, lease_token, lease_seconds=LEASE_SECONDS):
+        """续约，租约已被他人接手时返回 False"""
+        raise NotImplementedError
+
+    def record_result(self, job_id, lease_token, platform, result):
+        """保存单个平台的发布结果并计入发布统计（result['latency_ms'] 为平台调用耗时），租约失效时返回 False"""
+        raise NotImplementedError
+
+    def finish_job(self, job_id, lease_token, status, post_record=None):
+        """结束任务并写入发布历史和帖子索引，租约失效时返回 False"""
+        raise NotImplementedError
+
+    def get_job(self, job_id):
+        raise NotImplementedError
+
+    def count_jobs(self, status):
+        raise NotImplementedError
+
+    def list_finished_jobs(self, limit):
+        """最近结束的任务，新的在前"""
+        raise NotImplementedError
+
+    def prune_jobs(self, max_age=JOB_RETENTION_SECONDS):
+        """删除早已结束的任务"""
+        raise NotImplementedError
+
+    # ---- 凭据 ----
+
+    def save_credentials(self, platform, credentials):
+        """保存平台凭据，返回凭据句柄"""
+        raise NotImplementedError
+
+    def get_credentials(self, platform):
+        raise NotImplementedError
+
+    def list_credentials(self):
+        """返回 {平台: 凭据}"""
+        raise NotImplementedError
+
+    def list_credential_handles(self):
+        """返回 {平台: 凭据句柄}，用于展示和按句柄缓存连接，不包含凭据本身"""
+        raise NotImplementedError
+
+    def delete_credentials(self, platform=None):
+        """删除某个平台的凭据，platform 为 None 时全部删除"""
+        raise NotImplementedError
+
+    # ---- 发布历史 ----
+
+    def add_history(self, record):
+        raise NotImplementedError
+
+    def list_history(self, limit=None):
+        """按时间顺序返回最近的发布记录"""
+        raise NotImplementedError
+
+    def clear_history(self):
+        raise NotImplementedError
+
+    # ---- 帖子索引 ----
+
+    def add_post(self, record):
+        raise NotImplementedError
+
+    def list_posts(self):
+        """按发布时间顺序返回帖子索引"""
+        raise NotImplementedError
+
+    def update_post(self, post_id, platform, changes):
+        """更新帖子某个平台的条目（状态、编辑后的内容等）"""
+        raise NotImplementedError
+
+    # ---- 发布统计 ----
+
+    def add_publish_stat(self, platform, result, latency):
+        """把不经过任务队列的发布（界面发布、发件箱补发）计入统计，latency 含义同 record_publish_stat"""
+        raise NotImplementedError
+
+    def get_publish_stats(self):
+        """返回统计汇总，结构同 new_publish_stats"""
+        raise NotImplementedError
+
+    def clear_publish_stats(self):
+        raise NotImplementedError
+
+    # ---- 熔断器 ----
+
+    def get_circuit(self, account):
+        """返回凭据对应的熔断器状态，没有记录时返回 None"""
+        raise NotImplementedError
+
+    def update_circuit(self, account, update, default):
+        """在写事务中读取熔断器状态（没有记录时用 default 的副本），调用 update(circuit) 修改后写回并返回"""
+        raise NotImplementedError
+
+
+class SQLiteStore(CoordinationStore):
+    """SQLite 后端：WAL 模式允许读写并发，写操作用 BEGIN IMMEDIATE 串行化"""
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        # 库中保存平台凭据，只允许当前用户读写。SQLite 创建 -wal/-shm 文件时沿用主库的权限，
+        # 所以要在首次连接前以 0600 创建主库；旧版本创建的文件一并收紧
+        os.close(os.open(self.path, os.O_CREAT | os.O_WRONLY, 0o600))
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.chmod(self.path + suffix, 0o600)
+        self.local = threading.local()
+        self.connect().executescript(SQLITE_SCHEMA)
+
+    def connect(self):
+        db = getattr(self.local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self.local.db = db
+        return db
+
+    @contextmanager
+    def transaction(self):
+        """写事务：开始时即获取写锁，避免读后升级写锁时的死锁"""
+        db = self.connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def row_to_job(self, row):
+        job = json.loads(row['payload'])
+        job.update({
+            'job_id': row['job_id'],
+            'status': row['status'],
+            'results': json.loads(row['results']),
+            'lease_token': row['lease_token'],
+            'attempts': row['attempts'],
+            'created_at': format_timestamp(row['created_at']),
+            'finished_at': format_timestamp(row['finished_at'])
+        })
+        return job
+
+    def enqueue_job(self, payload, idempotency_key=None):
+        with self.transaction() as db:
+            if idempotency_key:
+                row = db.execute("SELECT * FROM jobs WHERE idempotency_key = ?", (idempotency_key,)).fetchone()
+                if row is not None:
+                    if json.loads(row['payload']) != payload:
+                        raise IdempotencyConflict(idempotency_key)
+                    return self.row_to_job(row), False
+            job_id = uuid.uuid4().hex
+            db.execute(
+                "INSERT INTO jobs (job_id, idempotency_key, payload, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, idempotency_key, json.dumps(payload, ensure_ascii=False), time.time())
+            )
+            row = db.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            return self.row_to_job(row), True
+
+    def claim_job(self, worker_id, lease_seconds=LEASE_SECONDS):
+        now = time.time()
+        with self.transaction() as db:
+            while True:
+                row = db.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                ).fetchone() or db.execute(
+                    "SELECT * FROM jobs WHERE status = 'running' AND lease_expires < ? ORDER BY created_at LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row['attempts'] >= JOB_MAX_ATTEMPTS:
+                    # 多次领取后仍未完成（进程反复崩溃），不再重试
+                    db.execute(
+                        "UPDATE jobs SET status = 'failed', lease_owner = NULL, finished_at = ? WHERE job_id = ?",
+                        (now, row['job_id'])
+                    )
+                    continue
+                db.execute(
+                    "UPDATE jobs SET status = 'running', lease_owner = ?, lease_token = lease_token + 1, "
+                    "lease_expires = ?, attempts = attempts + 1 WHERE job_id = ?",
+                    (worker_id, now + lease_seconds, row['job_id'])
+                )
+                row = db.execute("SELECT * FROM jobs WHERE job_id = ?", (row['job_id'],)).fetchone()
+                return self.row_to_job(row)
+
+    def renew_lease(self, job_id, lease_token, lease_seconds=LEASE_SECONDS):
+        with self.transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE job_id = ? AND lease_token = ? AND status = 'running'",
+                (time.time() + lease_seconds, job_id, lease_token)
+            )
+            return cursor.rowcount == 1
+
+    def record_result(self, job_id, lease_token, platform, result):
+        with self.transaction() as db:
+            row = db.execute(
+                "SELECT results FROM jobs WHERE job_id = ? AND lease_token = ? AND status = 'running'",
+                (job_id, lease_token)
+            ).fetchone()
+            if row is None:
+                return False
+            results = json.loads(row['results'])
+            results[platform] = result
+            db.execute(
+                "UPDATE jobs SET results = ? WHERE job_id = ?",
+                (json.dumps(results, ensure_ascii=False), job_id)
+            )
+            latency_ms = result.get('latency_ms')
+            self.insert_publish_stat(db, platform, result, latency_ms / 1000 if latency_ms is not None else None)
+            return True
+
+    def finish_job(self, job_id, lease_token, status, post_record=None):
+        now = time.time()
+        with self.transaction() as db:
+            row = db.execute(
+                "SELECT * FROM jobs WHERE job_id = ? AND lease_token = ? AND status = 'running'",
+                (job_id, lease_token)
+            ).fetchone()
+            if row is None:
+                return False
+            db.execute(
+                "UPDATE jobs SET status = ?, lease_owner = NULL, finished_at = ? WHERE job_id = ?",
+                (status, now, job_id)
+            )
+            job = self.row_to_job(row)
+            succeeded = [p for p, result in job['results'].items() if result.get('success')]
+            if succeeded:
+                content = job['content']
+                self.insert_history(db, {
+                    'timestamp': format_timestamp(now),
+                    'content': content[:50] + "..." if len(content) > 50 else content,
+                    'platforms': succeeded,
+                    'status': f"{len(succeeded)}/{len(job['platforms'])} 成功",
+                    'media_count': len(job.get('media_ids') or [])
+                })
+            if post_record and post_record['platforms']:
+                self.insert_post(db, post_record)
+            return True
+
+    def get_job(self, job_id):
+        row = self.connect().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self.row_to_job(row) if row is not None else None
+
+    def count_jobs(self, status):
+        return self.connect().execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)).fetchone()[0]
+
+    def list_finished_jobs(self, limit):
+        rows = self.connect().execute(
+            "SELECT * FROM jobs WHERE finished_at IS NOT NULL ORDER BY finished_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [self.row_to_job(row) for row in rows]
+
+    def prune_jobs(self, max_age=JOB_RETENTION_SECONDS):
+        with self.transaction() as db:
+            db.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+                (time.time() - max_age,)
+            )
+
+    def save_credentials(self, platform, credentials):
+        handle = get_credential_handle(platform, credentials)
+        with self.transaction() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO credentials (platform, handle, credentials, updated_at) VALUES (?, ?, ?, ?)",
+                (platform, handle, json.dumps(credentials), time.time())
+            )
+        return handle
+
+    def get_credentials(self, platform):
+        row = self.connect().execute(
+            "SELECT credentials FROM credentials WHERE platform = ?", (platform,)
+        ).fetchone()
+        return json.loads(row['credentials']) if row is not None else None
+
+    def list_credentials(self):
+        rows = self.connect().execute("SELECT platform, credentials FROM credentials ORDER BY platform").fetchall()
+        return {row['platform']: json.loads(row['credentials']) for row in rows}
+
+    def list_credential_handles(self):
+        rows = self.connect().execute("SELECT platform, handle FROM credentials ORDER BY platform").fetchall()
+        return {row['platform']: row['handle'] for row in rows}
+
+    def delete_credentials(self, platform=None):
+        with self.transaction() as db:
+            if platform is None:
+                db.execute("DELETE FROM credentials")
+            else:
+                db.execute("DELETE FROM credentials WHERE platform = ?", (platform,))
+
+    def insert_history(self, db, record):
+        db.execute("INSERT INTO history (record) VALUES (?)", (json.dumps(record, ensure_ascii=False),))
+        db.execute(
+            "DELETE FROM history WHERE id <= (SELECT MAX(id) FROM history) - ?",
+            (HISTORY_MAX_RECORDS,)
+        )
+
+    def add_history(self, record):
+        with self.transaction() as db:
+            self.insert_history(db, record)
+
+    def list_history(self, limit=None):
+        rows = self.connect().execute(
+            "SELECT record FROM history ORDER BY id DESC LIMIT ?", (limit or HISTORY_MAX_RECORDS,)
+        ).fetchall()
+        return [json.loads(row['record']) for row in reversed(rows)]
+
+    def clear_history(self):
+        with self.transaction() as db:
+            db.execute("DELETE FROM history")
+
+    def insert_post(self, db, record):
+        db.execute(
+            "INSERT INTO posts (post_id, record, created_at) VALUES (?, ?, ?)",
+            (record['post_id'], json.dumps(record, ensure_ascii=False), time.time())
+        )
+
+    def add_post(self, record):
+        with self.transaction() as db:
+            self.insert_post(db, record)
+
+    def list_posts(self):
+        rows = self.connect().execute("SELECT record FROM posts ORDER BY created_at").fetchall()
+        return [json.loads(row['record']) for row in rows]
+
+    def update_post(self, post_id, platform, changes):
+        with self.transaction() as db:
+            row = db.execute("SELECT record FROM posts WHERE post_id = ?", (post_id,)).fetchone()
+            if row is None:
+                return
+            record = json.loads(row['record'])
+            record['platforms'][platform].update(changes)
+            db.execute(
+                "UPDATE posts SET record = ? WHERE post_id = ?",
+                (json.dumps(record, ensure_ascii=False), post_id)
+            )
+
+    def read_publish_stats(self, db):
+        row = db.execute("SELECT rollup FROM stats WHERE id = 1").fetchone()
+        return json.loads(row['rollup']) if row is not None else new_publish_stats()
+
+    def insert_publish_stat(self, db, platform, result, latency):
+        stats = self.read_publish_stats(db)
+        record_publish_stat(stats, platform, result, latency)
+        db.execute(
+            "INSERT OR REPLACE INTO stats (id, rollup) VALUES (1, ?)",
+            (json.dumps(stats, ensure_ascii=False),)
+        )
+
+    def add_publish_stat(self, platform, result, latency):
+        with self.transaction() as db:
+            self.insert_publish_stat(db, platform, result, latency)
+
+    def get_publish_stats(self):
+        return self.read_publish_stats(self.connect())
+
+    def clear_publish_stats(self):
+        with self.transaction() as db:
+            db.execute("DELETE FROM stats")
+
+    def get_circuit(self, account):
+        row = self.connect().execute("SELECT circuit FROM circuits WHERE account = ?", (account,)).fetchone()
+        return json.loads(row['circuit']) if row is not None else None
+
+    def update_circuit(self, account, update, default):
+        with self.transaction() as db:
+            row = db.execute("SELECT circuit FROM circuits WHERE account = ?", (account,)).fetchone()
+            circuit = json.loads(row['circuit']) if row is not None else dict(default)
+            update(circuit)
+            db.execute(
+                "INSERT OR REPLACE INTO circuits (account, circuit) VALUES (?, ?)",
+                (account, json.dumps(circuit, ensure_ascii=False))
+            )
+            return circuit
+
+
+STORE_BACKENDS = {
+    'sqlite': SQLiteStore
+}
+
+
+def open_store(url):
+    """按存储地址打开存储，未注册协议名的地址视为 SQLite 文件路径"""
+    scheme, separator, location = url.partition('://')
+    if not separator:
+        return SQLiteStore(url)
+    if scheme == 'sqlite':
+        # sqlite:///abs/path 与 sqlite://relative/path
+        return SQLiteStore(location)
+    store_class = STORE_BACKENDS.get(scheme)
+    if store_class is None:
+        matches = entry_points(group='multisync.stores', name=scheme)
+        if not matches:
+            raise ValueError(f"未知的存储类型: {scheme}")
+        store_class = next(iter(matches)).load()
+    return store_class(location)
+
+
+def open_store_from_env():
+    """读取环境变量 MULTISYNC_STORE，未配置时返回 None（各进程独立运行）"""
+    url = os.environ.get('MULTISYNC_STORE')
+    return open_store(url) if url else None
@@ -0,0 +1,53 @@
+"""发布进程：从共享存储领取 HTTP 接口提交的发布任务并发布
+
+可以在同一台机器上启动多个进程分摊发布量；任务按租约领取，进程崩溃后
+租约过期，任务由其他进程接手，已成功的平台不会重复发布。
+
+用法:
+    MULTISYNC_STORE=sqlite:///var/lib/multisync/store.db python multisync_worker.py --threads 8
+"""
+import argparse
+import os
+import signal
+import socket
+import threading
+
+import multisync_api
+import multisync_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多平台发布工具发布进程")
+    parser.add_argument('--store', help="共享存储地址，默认读取环境变量 MULTISYNC_STORE")
+    parser.add_argument('--threads', type=int, default=8, help="并发发布任务数")
+    parser.add_argument('--credentials', help="平台凭据 JSON 文件，未提供时使用共享存储中的凭据")
+    parser.add_argument('--media-dir', default=multisync_api.DEFAULT_MEDIA_DIR, help="HTTP 接口上传图片的目录")
+    args = parser.parse_args()
+
+    store = multisync_store.open_store(args.store) if args.store else multisync_store.open_store_from_env()
+    if store is None:
+        parser.error("请通过 --store 或环境变量 MULTISYNC_STORE 指定共享存储")
+    connections = multisync_api.PlatformConnections(multisync_api.load_credentials(args.credentials), store)
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+
+    worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+    threads = [
+        threading.Thread(
+            target=multisync_api.run_store_worker,
+            args=(store, connections, args.media_dir, f"{worker_prefix}:{i}", stop_event)
+        )
+        for i in range(args.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    print(f"🛠️ 发布进程已启动: {worker_prefix}（{args.threads} 个线程）")
+    # 收到信号后等当前任务发布完再退出
+    for thread in threads:
+        thread.join()
+
+
+if __name__ == '__main__':
+    main()